@@ -0,0 +1,71 @@
+import random
+import sys
+import time
+from typing import Callable
+
+from games.maco import MacoGameParameters, MacoGameState, MacoForwardModel, MacoObservation
+
+
+def get_mid_game_observation(parameters: 'MacoGameParameters', forward_model: 'MacoForwardModel', turns: int,
+                             seed: int) -> 'MacoObservation':
+    """Plays random turns from the initial state and returns the resulting observation."""
+    random.seed(seed)
+    observation = MacoGameState(parameters).get_observation()
+    for _ in range(turns):
+        for _ in range(parameters.get_action_points_per_turn()):
+            candidate = observation.clone()
+            action = observation.get_random_action()
+            forward_model.step(candidate, action)
+            if forward_model.is_terminal(candidate):
+                continue
+            forward_model.step(observation, action)
+        forward_model.on_turn_ended(observation)
+    return observation
+
+
+def clone_and_step(observation: 'MacoObservation', forward_model: 'MacoForwardModel') -> int:
+    """Steps a clone of the observation for every valid action and returns the amount of steps."""
+    actions = observation.get_actions()
+    for action in actions:
+        new_observation = observation.clone()
+        forward_model.step(new_observation, action)
+    return len(actions)
+
+
+def step_and_unstep(observation: 'MacoObservation', forward_model: 'MacoForwardModel') -> int:
+    """Steps and reverts the observation for every valid action and returns the amount of steps."""
+    actions = observation.get_actions()
+    for action in actions:
+        undo = forward_model.step_with_undo(observation, action)
+        forward_model.unstep(observation, undo)
+    return len(actions)
+
+
+def measure(function: Callable[['MacoObservation', 'MacoForwardModel'], int], observation: 'MacoObservation',
+            forward_model: 'MacoForwardModel', duration: float) -> float:
+    """Runs the function repeatedly for `duration` seconds and returns the amount of steps per second."""
+    steps = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < duration:
+        steps += function(observation, forward_model)
+    return steps / (time.perf_counter() - t0)
+
+
+if __name__ == '__main__':
+    """ Compare clone+step against make/unmake (step_with_undo + unstep) on a mid-game position."""
+    """ Usage: python benchmark_forward_model.py [turns] [seconds]"""
+
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+
+    forward_model = MacoForwardModel()
+    for use_bitboard in [False, True]:
+        parameters = MacoGameParameters(use_bitboard=use_bitboard)
+        observation = get_mid_game_observation(parameters, forward_model, turns, 0)
+        print(f"\nBoard after {turns} turns (use_bitboard={use_bitboard}):\n{observation}")
+
+        clone_rate = measure(clone_and_step, observation, forward_model, duration)
+        undo_rate = measure(step_and_unstep, observation, forward_model, duration)
+        print("clone + step   : {:,.0f} steps/s".format(clone_rate))
+        print("step + unstep  : {:,.0f} steps/s".format(undo_rate))
+        print("speedup        : {:.2f}x".format(undo_rate / clone_rate))
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Any, Union
 from games.action import Action
 from games.observation import Observation
 from games.game_state import GameState
@@ -12,6 +12,16 @@ class ForwardModel(ABC):
         """Executes the action and moves the game to the next state."""
         pass
 
+    @abstractmethod
+    def step_with_undo(self, game_state: Union['GameState', 'Observation'], action: 'Action') -> Any:
+        """Executes the action and returns a record that `unstep` can use to revert it."""
+        pass
+
+    @abstractmethod
+    def unstep(self, game_state: Union['GameState', 'Observation'], undo: Any) -> None:
+        """Reverts a step previously executed with `step_with_undo`."""
+        pass
+
     @abstractmethod
     def on_turn_ended(self, game_state: Union['GameState', 'Observation']) -> None:
         """Moves the game to the next turn."""
@@ -24,9 +24,14 @@ class Game:
         self.game_state.reset()
         self.current_round = 0
 
-    def run(self, player_0: 'Player', player_1: 'Player', budget: float, rounds: int, verbose: bool, enforce_time: bool) -> int:
-        """Runs a `Game`."""
+    def run(self, player_0: 'Player', player_1: 'Player', budget: float, rounds: int, verbose: bool, enforce_time: bool,
+            forward_model_budget: Optional[int] = None) -> int:
+        """Runs a `Game`. If `forward_model_budget` is given, the players think for that many forward model visits per
+        turn instead of `budget` seconds, and the time is not enforced."""
         save_str = ""
+        player_0.set_forward_model_budget(forward_model_budget)
+        player_1.set_forward_model_budget(forward_model_budget)
+        enforce_time = enforce_time and forward_model_budget is None
 
         if self.game_state.get_game_parameters().get_seed() is None:
             seed = random.randrange(sys.maxsize)
@@ -76,6 +81,7 @@ class Game:
             print(f"{self.game_state}\n")
 
         observation = self.game_state.get_observation()
+        player.start_think_statistics()
         if enforce_time:
             try:
                 func_timeout.func_timeout(budget, self.think, args=[player, observation, budget])
@@ -84,6 +90,7 @@ class Game:
                     print("Too much time thinking!")
         else:
             self.think(player, observation, budget)
+        player.finish_think_statistics()
 
         for i in range(self.game_state.get_game_parameters().get_action_points_per_turn()):
             action = player.get_action(i)
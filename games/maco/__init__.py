@@ -1,12 +1,20 @@
-__all__ = ('MacoPieceType', 'MacoPiece', 'MacoAction', 'MacoPieceCollection', 'MacoGameParameters', 'MacoObservation',
-           'MacoGameState', 'MacoForwardModel', 'MacoGame')
+__all__ = ('MacoPieceType', 'MacoPiece', 'MacoAction', 'MacoPieceCollection', 'MacoBitboard', 'MacoLineWindows',
+           'MacoLineState', 'MacoZobristTable', 'MacoGameParameters', 'MacoObservation', 'MacoGameState',
+           'MacoStepUndo', 'MacoForwardModel', 'MacoBatchState', 'MacoBatchForwardModel', 'MacoGame')
 
 from .maco_piece_type import MacoPieceType
 from .maco_piece import MacoPiece
 from .maco_action import MacoAction
 from .maco_piece_collection import MacoPieceCollection
+from .maco_bitboard import MacoBitboard
+from .maco_line_windows import MacoLineWindows
+from .maco_line_state import MacoLineState
+from .maco_zobrist import MacoZobristTable
 from .maco_game_parameters import MacoGameParameters
 from .maco_observation import MacoObservation
 from .maco_game_state import MacoGameState
+from .maco_step_undo import MacoStepUndo
 from .maco_forward_model import MacoForwardModel
+from .maco_batch_state import MacoBatchState
+from .maco_batch_forward_model import MacoBatchForwardModel
 from .maco_game import MacoGame
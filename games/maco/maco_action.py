@@ -1,7 +1,8 @@
+from functools import lru_cache
 from typing import Tuple
 from copy import deepcopy
 from games import Action
-from games.maco.maco_piece import MacoPiece
+from games.maco.maco_piece import MacoPiece, MacoPieceType
 
 class MacoAction(Action):
     def __init__(self, piece: 'MacoPiece', pos: Tuple[int, int]):
@@ -22,4 +23,13 @@ class MacoAction(Action):
         return self.pos
 
     def __str__(self) -> str:
-        return f"Action[{self.piece}, {self.pos if self.pos is not None else ''}]"
\ No newline at end of file
+        return f"Action[{self.piece}, {self.pos if self.pos is not None else ''}]"
+
+
+@lru_cache(maxsize=None)
+def get_action_table(board_size: int) -> Tuple[Tuple['MacoAction', ...], ...]:
+    """Returns one `MacoAction` per cell and piece type, indexed by the cell index `x * board_size + y` and then by the
+    position of the piece type in `MacoPieceType`. The actions are shared by every observation with this board size,
+    so they must not be modified; copy them with `clone` instead."""
+    return tuple(tuple(MacoAction(MacoPiece(piece_type), (x, y)) for piece_type in MacoPieceType)
+                 for x in range(board_size) for y in range(board_size))
\ No newline at end of file
@@ -0,0 +1,136 @@
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import numpy as np
+
+from games.maco.maco_piece_type import MacoPieceType
+from games.maco.maco_action import MacoAction
+from games.maco.maco_game_parameters import MacoGameParameters
+from games.maco.maco_batch_state import PIECE_TYPES, MacoBatchState
+from games.maco.maco_score_kernel import EMPTY_CELL, calculate_scores
+
+NO_CELL = -1
+"""Cell used in batch actions without a position, which are always invalid."""
+
+REGULAR = PIECE_TYPES.index(MacoPieceType.REGULAR)
+EXPLODE = PIECE_TYPES.index(MacoPieceType.EXPLODE)
+BLOCK = PIECE_TYPES.index(MacoPieceType.BLOCK)
+
+
+@lru_cache(maxsize=None)
+def get_explode_cells(board_size: int) -> np.ndarray:
+    """Returns a `(cells, 5)` array with each cell and its four neighbours. Neighbours outside the board are replaced by
+    the cell itself, so clearing all five entries clears exactly the area of an explode piece."""
+    explode_cells = np.empty((board_size * board_size, 5), dtype=np.int32)
+    for x in range(board_size):
+        for y in range(board_size):
+            cell = x * board_size + y
+            for i, (dx, dy) in enumerate([(0, 0), (0, 1), (0, -1), (1, 0), (-1, 0)]):
+                nx, ny = x + dx, y + dy
+                inside = 0 <= nx < board_size and 0 <= ny < board_size
+                explode_cells[cell, i] = nx * board_size + ny if inside else cell
+    return explode_cells
+
+
+class MacoBatchForwardModel:
+    """
+    Forward model that applies one action to every state of a `MacoBatchState` with NumPy operations, following the
+    same rules as `MacoForwardModel.step` and `MacoForwardModel.on_turn_ended`.
+
+    Actions are given as two integer arrays: the cell index `x * board_size + y` of each action (`NO_CELL` if it has no
+    position) and the index of its piece type in `PIECE_TYPES`.
+    """
+
+    # region Methods
+    def step_batch(self, batch: 'MacoBatchState', cells: np.ndarray, piece_types: np.ndarray,
+                   active: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Executes one action in every state, or only in the states where the boolean mask `active` is set. Returns
+        the reward of each state for the player that moved, as `SimpleHeuristic` computes it, and the terminal flags."""
+        game_parameters = batch.game_parameters
+        board_size = game_parameters.board_size
+        rows = np.arange(len(batch)) if active is None else np.flatnonzero(active)
+        cells = np.asarray(cells)[rows]
+        piece_types = np.asarray(piece_types)[rows]
+        turns = batch.current_turn[rows].astype(np.intp)
+        batch.action_points_left[rows] -= 1
+
+        # An action is valid on an empty cell, and regular pieces can't go in blocked rows
+        has_cell = cells != NO_CELL
+        safe_cells = np.where(has_cell, cells, 0)
+        action_rows = safe_cells // board_size
+        empty = has_cell & (batch.boards[rows, safe_cells] == EMPTY_CELL)
+        blocked = batch.blocked_rows[rows, action_rows] > 0
+        valid = empty & (((piece_types == REGULAR) & ~blocked) | (piece_types == EXPLODE) | (piece_types == BLOCK))
+
+        regular = valid & (piece_types == REGULAR)
+        batch.boards[rows[regular], cells[regular]] = turns[regular]
+
+        explode = valid & (piece_types == EXPLODE)
+        batch.boards[rows[explode][:, None], get_explode_cells(board_size)[cells[explode]]] = EMPTY_CELL
+
+        block = valid & (piece_types == BLOCK)
+        batch.blocked_rows[rows[block], action_rows[block]] = game_parameters.action_points_per_turn
+
+        pieces = batch.pieces[rows[valid], turns[valid], piece_types[valid]]
+        batch.pieces[rows[valid], turns[valid], piece_types[valid]] = np.maximum(pieces - 1, 0)
+
+        # Scores of valid actions come from the board, invalid ones get the penalty
+        boards = batch.boards[rows]
+        wins = self.has_win(boards, game_parameters)
+        full = (boards != EMPTY_CELL).all(axis=-1)
+        valid_rows = rows[valid]
+        scores = calculate_scores(boards[valid].reshape(-1, board_size, board_size),
+                                  game_parameters.win_condition_length).astype(np.int64)
+        scores[np.flatnonzero(wins[valid]), turns[valid][wins[valid]]] += 1000000
+        batch.scores[valid_rows] = scores
+        batch.scores[rows[~valid], turns[~valid]] -= 10
+
+        # A full board without lines is a draw
+        draw = full & ~wins
+        batch.scores[rows[draw]] = 0
+        batch.terminal[rows] = wins | draw
+
+        all_turns = batch.current_turn.astype(np.intp)
+        all_rows = np.arange(len(batch))
+        rewards = batch.scores[all_rows, all_turns] - batch.scores[all_rows, 1 - all_turns]
+        return rewards, batch.terminal.copy()
+
+    def on_turn_ended_batch(self, batch: 'MacoBatchState', active: Optional[np.ndarray] = None) -> None:
+        """Passes the turn in the states whose turn is finished and counts down the blocked rows of every state, or only
+        of the states where the boolean mask `active` is set."""
+        rows = np.arange(len(batch)) if active is None else np.flatnonzero(active)
+        finished = rows[batch.action_points_left[rows] == 0]
+        batch.current_turn[finished] = 1 - batch.current_turn[finished]
+        batch.action_points_left[finished] = batch.game_parameters.action_points_per_turn
+        batch.blocked_rows[rows] = np.maximum(batch.blocked_rows[rows] - 1, 0)
+
+    def sample_random_actions(self, batch: 'MacoBatchState', rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns a regular piece action on a uniformly random empty cell of each state, like
+        `MacoObservation.get_random_action`. States without empty cells get `NO_CELL`."""
+        keys = rng.random(batch.boards.shape)
+        keys[batch.boards != EMPTY_CELL] = -1.0
+        cells = keys.argmax(axis=-1)
+        cells[keys.max(axis=-1) < 0] = NO_CELL
+        return cells, np.full(len(batch), REGULAR, dtype=np.intp)
+
+    def encode_actions(self, actions: List[Optional['MacoAction']], board_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the cell and piece type arrays of a list of actions. Missing actions get `NO_CELL`."""
+        cells = np.full(len(actions), NO_CELL, dtype=np.intp)
+        piece_types = np.full(len(actions), REGULAR, dtype=np.intp)
+        for index, action in enumerate(actions):
+            if action is None or action.get_position() is None:
+                continue
+            x, y = action.get_position()
+            cells[index] = x * board_size + y
+            piece_types[index] = PIECE_TYPES.index(action.get_piece().get_piece_type())
+        return cells, piece_types
+
+    def is_turn_finished_batch(self, batch: 'MacoBatchState') -> np.ndarray:
+        return batch.action_points_left == 0
+
+    def has_win(self, boards: np.ndarray, game_parameters: 'MacoGameParameters') -> np.ndarray:
+        """Returns whether any player has a complete line in each of the flat boards."""
+        windows = game_parameters.get_line_windows()
+        lines = boards[:, windows.window_cells]
+        return ((lines == 0).all(axis=-1) | (lines == 1).all(axis=-1)).any(axis=-1)
+    # endregion
+
@@ -0,0 +1,87 @@
+from typing import List, Union
+import numpy as np
+
+from games.maco.maco_piece_type import MacoPieceType
+from games.maco.maco_game_parameters import MacoGameParameters
+from games.maco.maco_score_kernel import EMPTY_CELL, board_to_array
+
+PIECE_TYPES = tuple(MacoPieceType)
+"""Piece types in the order of the last axis of `MacoBatchState.pieces`, also used to encode batch actions."""
+
+
+class MacoBatchState:
+    """
+    Struct-of-arrays copy of `size` Maco states that share the same `MacoGameParameters`, stepped together by
+    `MacoBatchForwardModel`.
+
+    Attributes:
+        boards (np.ndarray): `(size, board_size * board_size)` int8 array with the owner of each cell `x * board_size + y`
+            or `EMPTY_CELL`.
+        current_turn (np.ndarray): Player to move in each state.
+        action_points_left (np.ndarray): Action points left in each state.
+        scores (np.ndarray): `(size, 2)` array with the score of each player.
+        pieces (np.ndarray): `(size, 2, piece types)` array with the pieces left to each player, in `PIECE_TYPES` order.
+        blocked_rows (np.ndarray): `(size, board_size)` array with the turns each row stays blocked, 0 if it is not.
+        terminal (np.ndarray): Whether each game is over.
+    """
+
+    def __init__(self, game_parameters: 'MacoGameParameters', size: int) -> None:
+        board_size = game_parameters.board_size
+        self.game_parameters = game_parameters
+        self.boards = np.full((size, board_size * board_size), EMPTY_CELL, dtype=np.int8)
+        self.current_turn = np.zeros(size, dtype=np.int8)
+        self.action_points_left = np.full(size, game_parameters.action_points_per_turn, dtype=np.int32)
+        self.scores = np.zeros((size, 2), dtype=np.int64)
+        self.pieces = np.zeros((size, 2, len(PIECE_TYPES)), dtype=np.int32)
+        self.pieces[:, :, PIECE_TYPES.index(MacoPieceType.REGULAR)] = game_parameters.pieces_per_player
+        self.pieces[:, :, PIECE_TYPES.index(MacoPieceType.EXPLODE)] = game_parameters.explode_per_player
+        self.pieces[:, :, PIECE_TYPES.index(MacoPieceType.BLOCK)] = game_parameters.block_per_player
+        self.blocked_rows = np.zeros((size, board_size), dtype=np.int32)
+        self.terminal = np.zeros(size, dtype=bool)
+
+    # region Methods
+    def clone(self) -> 'MacoBatchState':
+        """Returns a copy of the batch."""
+        new_batch = MacoBatchState.__new__(MacoBatchState)
+        new_batch.game_parameters = self.game_parameters
+        new_batch.boards = self.boards.copy()
+        new_batch.current_turn = self.current_turn.copy()
+        new_batch.action_points_left = self.action_points_left.copy()
+        new_batch.scores = self.scores.copy()
+        new_batch.pieces = self.pieces.copy()
+        new_batch.blocked_rows = self.blocked_rows.copy()
+        new_batch.terminal = self.terminal.copy()
+        return new_batch
+
+    def set_state(self, index: int, game_state: Union['MacoGameState', 'MacoObservation']) -> None:
+        """Copies a scalar state into the given slot of the batch."""
+        board_size = self.game_parameters.board_size
+        self.boards[index] = board_to_array(game_state.board, board_size).ravel()
+        self.current_turn[index] = game_state.current_turn
+        self.action_points_left[index] = game_state.action_points_left
+        self.scores[index] = (game_state.player_0_score, game_state.player_1_score)
+        for player, pieces in enumerate([game_state.player_0_pieces, game_state.player_1_pieces]):
+            self.pieces[index, player] = [pieces.get_amount(piece_type) for piece_type in PIECE_TYPES]
+        self.blocked_rows[index] = 0
+        for row, duration in game_state.blocked_rows.items():
+            self.blocked_rows[index, row] = duration
+        self.terminal[index] = game_state.terminal
+
+    def set_states(self, game_states: List[Union['MacoGameState', 'MacoObservation']]) -> None:
+        """Copies the scalar states into the first slots of the batch."""
+        for index, game_state in enumerate(game_states):
+            self.set_state(index, game_state)
+    # endregion
+
+    # region Getters
+    def get_size(self) -> int:
+        return len(self.boards)
+
+    def get_game_parameters(self) -> 'MacoGameParameters':
+        return self.game_parameters
+    # endregion
+
+    # region Override
+    def __len__(self) -> int:
+        return len(self.boards)
+    # endregion
@@ -0,0 +1,116 @@
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+
+@lru_cache(maxsize=None)
+def get_line_masks(board_size: int, length: int) -> Tuple[Tuple[int, int], ...]:
+    """Returns a `(shift, start_mask)` pair per direction, where `start_mask` has a bit set for every cell from which a
+    line of `length` cells fits inside the board in that direction."""
+    masks = []
+    for dx, dy in [(1, 0), (0, 1), (1, 1), (1, -1)]:
+        start_mask = 0
+        for x in range(board_size):
+            for y in range(board_size):
+                end_x, end_y = x + (length - 1) * dx, y + (length - 1) * dy
+                if 0 <= end_x < board_size and 0 <= end_y < board_size:
+                    start_mask |= 1 << (x * board_size + y)
+        masks.append((dx * board_size + dy, start_mask))
+    return tuple(masks)
+
+
+class MacoBitboard:
+    """
+    Board of the game Maco stored as one integer bitboard per player plus an occupancy mask.
+
+    The cell `(x, y)` is the bit `x * board_size + y` of each bitboard. Reading and writing through `board[(x, y)]`
+    behaves like the dictionary board, so players do not need to know which representation is in use.
+    """
+    __slots__ = ('board_size', 'player_bits', 'occupancy')
+
+    def __init__(self, board_size: int) -> None:
+        self.board_size = board_size
+        self.player_bits: List[int] = [0, 0]
+        self.occupancy = 0
+
+    # region Methods
+    def copy(self) -> 'MacoBitboard':
+        """Returns a copy of the board."""
+        new_board = MacoBitboard.__new__(MacoBitboard)
+        new_board.board_size = self.board_size
+        new_board.player_bits = self.player_bits.copy()
+        new_board.occupancy = self.occupancy
+        return new_board
+
+    def get(self, position: Tuple[int, int], default: Optional[int] = None) -> Optional[int]:
+        """Returns the player owning the given position, or `default` if it is empty or outside the board."""
+        if position not in self:
+            return default
+        value = self[position]
+        return default if value is None else value
+
+    def has_line(self, player: int, length: int) -> bool:
+        """Returns whether the player has `length` pieces in a row in any direction."""
+        bits = self.player_bits[player]
+        for shift, start_mask in get_line_masks(self.board_size, length):
+            line = bits & start_mask
+            for i in range(1, length):
+                if not line:
+                    break
+                line &= bits >> (i * shift)
+            if line:
+                return True
+        return False
+
+    def is_full(self) -> bool:
+        """Returns whether every cell of the board is occupied."""
+        return self.occupancy == (1 << (self.board_size * self.board_size)) - 1
+
+    def keys(self) -> Iterator[Tuple[int, int]]:
+        return iter(self)
+
+    def values(self) -> Iterator[Optional[int]]:
+        return (self[position] for position in self)
+
+    def items(self) -> Iterator[Tuple[Tuple[int, int], Optional[int]]]:
+        return ((position, self[position]) for position in self)
+    # endregion
+
+    # region Override
+    def __getitem__(self, position: Tuple[int, int]) -> Optional[int]:
+        bit = 1 << (position[0] * self.board_size + position[1])
+        if not self.occupancy & bit:
+            return None
+        return 0 if self.player_bits[0] & bit else 1
+
+    def __setitem__(self, position: Tuple[int, int], value: Optional[int]) -> None:
+        bit = 1 << (position[0] * self.board_size + position[1])
+        self.player_bits[0] &= ~bit
+        self.player_bits[1] &= ~bit
+        if value is None:
+            self.occupancy &= ~bit
+        else:
+            self.player_bits[value] |= bit
+            self.occupancy |= bit
+
+    def __contains__(self, position: object) -> bool:
+        if not isinstance(position, tuple) or len(position) != 2:
+            return False
+        x, y = position
+        return 0 <= x < self.board_size and 0 <= y < self.board_size
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return ((i, j) for i in range(self.board_size) for j in range(self.board_size))
+
+    def __len__(self) -> int:
+        return self.board_size * self.board_size
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, MacoBitboard):
+            return self.board_size == other.board_size and self.player_bits == other.player_bits
+        if isinstance(other, dict):
+            return len(self) == len(other) and all(other.get(position) == value for position, value in self.items())
+        return False
+
+    def __str__(self) -> str:
+        return str(dict(self.items()))
+    # endregion
@@ -0,0 +1,84 @@
+from typing import Iterable, Iterator, List
+import random
+
+
+class MacoCellSet:
+    """
+    Set of board cell indices with O(1) add, discard, membership test and uniform random choice.
+
+    The cells are kept unordered in a list, and removals swap the last cell into the place of the removed one. A second
+    list holds the place of each cell in the first one, or -1 if the cell is not in the set.
+    """
+    __slots__ = ('cells', 'places')
+
+    def __init__(self, size: int, cells: Iterable[int] = ()) -> None:
+        self.cells: List[int] = []
+        self.places: List[int] = [-1] * size
+        for cell in cells:
+            self.add(cell)
+
+    # region Methods
+    def copy(self) -> 'MacoCellSet':
+        """Returns a copy of the set."""
+        new_cell_set = MacoCellSet.__new__(MacoCellSet)
+        new_cell_set.cells = self.cells.copy()
+        new_cell_set.places = self.places.copy()
+        return new_cell_set
+
+    def add(self, cell: int) -> None:
+        if self.places[cell] < 0:
+            self.places[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def discard(self, cell: int) -> None:
+        place = self.places[cell]
+        if place < 0:
+            return
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[place] = last
+            self.places[last] = place
+        self.places[cell] = -1
+
+    def insert(self, cell: int, place: int) -> None:
+        """Adds the cell back at `place`, which must be its place before the last `discard`, so the order of the cells
+        is restored exactly."""
+        if place == len(self.cells):
+            self.places[cell] = place
+            self.cells.append(cell)
+            return
+        moved = self.cells[place]
+        self.places[moved] = len(self.cells)
+        self.cells.append(moved)
+        self.cells[place] = cell
+        self.places[cell] = place
+
+    def get_place(self, cell: int) -> int:
+        """Returns the place of the cell in the order of the set, or -1 if it is not in the set."""
+        return self.places[cell]
+
+    def choice(self, rng: random.Random) -> int:
+        """Returns a uniformly random cell of the set, which must not be empty."""
+        return self.cells[rng.randrange(len(self.cells))]
+    # endregion
+
+    # region Override
+    def __contains__(self, cell: int) -> bool:
+        return self.places[cell] >= 0
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.cells)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, MacoCellSet):
+            return set(self.cells) == set(other.cells)
+        if isinstance(other, (set, frozenset)):
+            return set(self.cells) == other
+        return False
+
+    def __str__(self) -> str:
+        return str(sorted(self.cells))
+    # endregion
@@ -1,18 +1,32 @@
-from typing import Union, Tuple, List, Any
+from typing import Union, Tuple, List, Any, Optional
+import numpy as np
 
 from games.maco.maco_piece_type import MacoPieceType
 from games.maco.maco_game_state import MacoGameState
 from games.maco.maco_action import MacoAction
 from games.forward_model import ForwardModel
 from games.maco.maco_observation import MacoObservation
+from games.maco.maco_bitboard import MacoBitboard
+from games.maco.maco_score_kernel import board_to_array, calculate_scores
+from games.maco.maco_step_undo import MacoStepUndo
+from games.maco.maco_piece import MacoPiece
 
 class MacoForwardModel(ForwardModel):
     def __init__(self):
         super().__init__()
 
-    def step(self, game_state: Union['MacoGameState', 'MacoObservation'], action: 'MacoAction') -> bool:
-        game_state.action_points_left -= 1
-        pieces = game_state.player_0_pieces if game_state.current_turn == 0 else game_state.player_1_pieces
+    def step(self, game_state: Union['MacoGameState', 'MacoObservation'], action: 'MacoAction',
+             undo: Optional['MacoStepUndo'] = None) -> bool:
+        """Executes the action and updates the terminal status of the state. If an `undo` record is given, the changes
+        made are written into it."""
+        valid = self.execute_action(game_state, action, undo)
+        self.update_terminal(game_state)
+        return valid
+
+    def execute_action(self, game_state: Union['MacoGameState', 'MacoObservation'], action: 'MacoAction',
+                       undo: Optional['MacoStepUndo'] = None) -> bool:
+        """Applies the action to the board, pieces and scores, or the invalid action penalty if it can't be applied."""
+        self.set_action_points(game_state, game_state.action_points_left - 1)
 
         if isinstance(game_state, MacoGameState):
             observation = game_state.get_observation()
@@ -31,53 +45,104 @@ class MacoForwardModel(ForwardModel):
             if game_state.board[action_pos] is not None or x in game_state.blocked_rows:
                 self.give_invalid_action_penalty(game_state)
                 return False  # Disallow placing a piece in a blocked row or occupied position
-            game_state.board[action_pos] = game_state.current_turn
-            pieces.remove_piece(action_piece)
+            self.set_cell(game_state, action_pos, game_state.current_turn, undo)
+            self.remove_piece(game_state, action_piece, undo)
             self.update_score(game_state)
             return True
 
         if action_pos is not None and action_piece.get_piece_type() == MacoPieceType.EXPLODE:
-            if not self.explode_position(game_state, action_pos):
+            if not self.explode_position(game_state, action_pos, undo):
                 self.give_invalid_action_penalty(game_state)
                 return False
-            pieces.remove_piece(action_piece)
+            self.remove_piece(game_state, action_piece, undo)
             self.update_score(game_state)
             return True
 
         if action_pos is not None and action_piece.get_piece_type() == MacoPieceType.BLOCK:
-            if not self.block_position(game_state, action_pos):
+            if not self.block_position(game_state, action_pos, undo):
                 self.give_invalid_action_penalty(game_state)
                 return False
-            pieces.remove_piece(action_piece)
+            self.remove_piece(game_state, action_piece, undo)
             self.update_score(game_state)
             return True
 
         return False
 
+    def step_with_undo(self, game_state: Union['MacoGameState', 'MacoObservation'],
+                       action: 'MacoAction') -> 'MacoStepUndo':
+        """Executes the action like `step` and returns a record that `unstep` can use to revert it."""
+        undo = MacoStepUndo(game_state)
+        undo.valid = self.step(game_state, action, undo)
+        return undo
+
+    def unstep(self, game_state: Union['MacoGameState', 'MacoObservation'], undo: 'MacoStepUndo') -> None:
+        """Reverts the step recorded in `undo`. Steps must be reverted in the reverse order they were executed."""
+        board_size = game_state.game_parameters.board_size
+        for position, value, place in reversed(undo.cells):
+            game_state.line_state.update_cell(position, game_state.board[position], value)
+            game_state.board[position] = value
+            cell = position[0] * board_size + position[1]
+            if value is None:
+                game_state.empty_cells.insert(cell, place)
+            else:
+                game_state.empty_cells.discard(cell)
+
+        if undo.blocked_row is not None:
+            if undo.blocked_row_duration is None:
+                del game_state.blocked_rows[undo.blocked_row]
+            else:
+                game_state.blocked_rows[undo.blocked_row] = undo.blocked_row_duration
+
+        if undo.removed_piece_type is not None:
+            pieces = game_state.player_0_pieces if game_state.current_turn == 0 else game_state.player_1_pieces
+            pieces.add_pieces_of_type(undo.removed_piece_type, 1)
+
+        game_state.action_points_left = undo.action_points_left
+        game_state.player_0_score = undo.player_0_score
+        game_state.player_1_score = undo.player_1_score
+        game_state.zobrist_key = undo.zobrist_key
+        game_state.terminal = undo.terminal
+        game_state.winner = undo.winner
+
     def on_turn_ended(self, game_state: Union['MacoGameState', 'MacoObservation']) -> None:
         if self.is_turn_finished(game_state):
+            zobrist_table = game_state.game_parameters.get_zobrist_table()
+            game_state.zobrist_key ^= zobrist_table.turn
             game_state.current_turn = (game_state.current_turn + 1) % 2
-            game_state.action_points_left = game_state.game_parameters.action_points_per_turn
+            self.set_action_points(game_state, game_state.game_parameters.action_points_per_turn)
 
         rows_to_remove: list[Any] = []
 
-        for row, duration in game_state.blocked_rows.items():
-            game_state.blocked_rows[row] -= 1
+        for row, duration in list(game_state.blocked_rows.items()):
+            self.set_blocked_row(game_state, row, duration - 1)
             if game_state.blocked_rows[row] == 0:
                 rows_to_remove.append(row)
 
         for row in rows_to_remove:
-            del game_state.blocked_rows[row]
+            self.set_blocked_row(game_state, row, None)
 
     def is_terminal(self, game_state: Union['MacoGameState', 'MacoObservation']) -> bool:
-        if self.check_for_win(game_state):
-            return True
-        elif self.check_for_draw(game_state):
+        """Returns the terminal status stored by the last `step`, without changing the state."""
+        return game_state.terminal
+
+    def update_terminal(self, game_state: Union['MacoGameState', 'MacoObservation']) -> None:
+        """Stores whether the game is over and who won it. A full board without lines is a draw and both scores are
+        set to 0."""
+        line_state = game_state.line_state
+        if line_state.has_win():
+            game_state.terminal = True
+            if line_state.get_winning_lines(game_state.current_turn) > 0:
+                game_state.winner = game_state.current_turn
+            else:
+                game_state.winner = 1 - game_state.current_turn
+        elif line_state.is_full():
+            game_state.terminal = True
+            game_state.winner = -1
             game_state.player_0_score = 0
             game_state.player_1_score = 0
-            return True
         else:
-            return False
+            game_state.terminal = False
+            game_state.winner = None
 
     def is_turn_finished(self, observation: Union['MacoGameState', 'MacoObservation']) -> bool:
         return observation.get_action_points_left() == 0
@@ -86,16 +151,12 @@ class MacoForwardModel(ForwardModel):
         board_size = game_state.game_parameters.board_size
         win_length = game_state.game_parameters.win_condition_length
 
-        for i in range(board_size):
-            for j in range(board_size):
-                if game_state.board[(i, j)] is not None:
-                    player = game_state.board[(i, j)]
-                    if self.check_direction(game_state, i, j, 1, 0, win_length, player) or \
-                            self.check_direction(game_state, i, j, 0, 1, win_length, player) or \
-                            self.check_direction(game_state, i, j, 1, 1, win_length, player) or \
-                            self.check_direction(game_state, i, j, 1, -1, win_length, player):
-                        return True
-        return False
+        if isinstance(game_state.board, MacoBitboard):
+            return game_state.board.has_line(0, win_length) or game_state.board.has_line(1, win_length)
+
+        windows = game_state.game_parameters.get_line_windows()
+        lines = board_to_array(game_state.board, board_size).ravel()[windows.window_cells]
+        return bool(np.any((lines == 0).all(axis=1) | (lines == 1).all(axis=1)))
 
     def check_direction(self, game_state: Union['MacoGameState', 'MacoObservation'],
                         x: int, y: int, dx: int, dy: int, length: int, player: int) -> bool:
@@ -107,6 +168,9 @@ class MacoForwardModel(ForwardModel):
         return True
 
     def check_for_draw(self, game_state: Union['MacoGameState', 'MacoObservation']) -> bool:
+        if isinstance(game_state.board, MacoBitboard):
+            return game_state.board.is_full()
+
         board_size = game_state.game_parameters.board_size
         for i in range(board_size):
             for j in range(board_size):
@@ -115,7 +179,7 @@ class MacoForwardModel(ForwardModel):
         return True
 
     def explode_position(self, game_state: Union['MacoGameState', 'MacoObservation'],
-                         position: Tuple[int, int]) -> bool:
+                         position: Tuple[int, int], undo: Optional['MacoStepUndo'] = None) -> bool:
         board_size = game_state.game_parameters.board_size
         x, y = position
 
@@ -125,33 +189,93 @@ class MacoForwardModel(ForwardModel):
         for dx, dy in [(0, 0), (0, 1), (0, -1), (1, 0), (-1, 0)]:
             nx, ny = x + dx, y + dy
             if 0 <= nx < board_size and 0 <= ny < board_size:
-                game_state.board[(nx, ny)] = None
+                self.set_cell(game_state, (nx, ny), None, undo)
         return True
 
-    def block_position(self, game_state: Union['MacoGameState', 'MacoObservation'], position: Tuple[int, int]) -> bool:
+    def block_position(self, game_state: Union['MacoGameState', 'MacoObservation'], position: Tuple[int, int],
+                       undo: Optional['MacoStepUndo'] = None) -> bool:
         x, y = position
         if game_state.board[(x, y)] is not None:
             return False
 
-        game_state.blocked_rows[x] = game_state.game_parameters.action_points_per_turn
-        game_state.board[(x, y)] = None
+        if undo is not None:
+            undo.blocked_row = x
+            undo.blocked_row_duration = game_state.blocked_rows.get(x)
+        self.set_blocked_row(game_state, x, game_state.game_parameters.action_points_per_turn)
+        self.set_cell(game_state, (x, y), None, undo)
         return True
 
+    def set_cell(self, game_state: Union['MacoGameState', 'MacoObservation'], position: Tuple[int, int],
+                 value: Optional[int], undo: Optional['MacoStepUndo'] = None) -> None:
+        """Sets the content of a board cell and updates the empty cells, the line windows and the Zobrist key."""
+        old_value = game_state.board[position]
+        if old_value == value:
+            return
+        cell = position[0] * game_state.game_parameters.board_size + position[1]
+        if undo is not None:
+            undo.cells.append((position, old_value, game_state.empty_cells.get_place(cell)))
+        game_state.board[position] = value
+        game_state.line_state.update_cell(position, old_value, value)
+
+        if value is None:
+            game_state.empty_cells.add(cell)
+        elif old_value is None:
+            game_state.empty_cells.discard(cell)
+
+        zobrist_table = game_state.game_parameters.get_zobrist_table()
+        game_state.zobrist_key ^= zobrist_table.get_cell_key(cell, old_value) ^ zobrist_table.get_cell_key(cell, value)
+
+    def set_action_points(self, game_state: Union['MacoGameState', 'MacoObservation'], action_points: int) -> None:
+        """Sets the action points left and updates the Zobrist key."""
+        zobrist_table = game_state.game_parameters.get_zobrist_table()
+        game_state.zobrist_key ^= zobrist_table.get_action_points_key(game_state.action_points_left) ^ \
+            zobrist_table.get_action_points_key(action_points)
+        game_state.action_points_left = action_points
+
+    def set_blocked_row(self, game_state: Union['MacoGameState', 'MacoObservation'], row: int,
+                        duration: Optional[int]) -> None:
+        """Sets the turns a row stays blocked, or unblocks it if `duration` is None, and updates the Zobrist key."""
+        zobrist_table = game_state.game_parameters.get_zobrist_table()
+        old_duration = game_state.blocked_rows.get(row)
+        if old_duration is not None:
+            game_state.zobrist_key ^= zobrist_table.get_blocked_row_key(row, old_duration)
+        if duration is None:
+            game_state.blocked_rows.pop(row, None)
+        else:
+            game_state.zobrist_key ^= zobrist_table.get_blocked_row_key(row, duration)
+            game_state.blocked_rows[row] = duration
+
+    def remove_piece(self, game_state: Union['MacoGameState', 'MacoObservation'], piece: 'MacoPiece',
+                     undo: Optional['MacoStepUndo'] = None) -> None:
+        """Removes a piece of the given type from the current player, if there is any left."""
+        pieces = game_state.player_0_pieces if game_state.current_turn == 0 else game_state.player_1_pieces
+        piece_type = piece.get_piece_type()
+        amount = pieces.get_amount(piece_type)
+        if amount == 0:
+            return
+        if undo is not None:
+            undo.removed_piece_type = piece_type
+        pieces.remove_piece(piece)
+
+        zobrist_table = game_state.game_parameters.get_zobrist_table()
+        game_state.zobrist_key ^= zobrist_table.get_pieces_key(game_state.current_turn, piece_type, amount) ^ \
+            zobrist_table.get_pieces_key(game_state.current_turn, piece_type, amount - 1)
+
     def update_score(self, game_state: Union['MacoGameState', 'MacoObservation']) -> bool:
-        board_size = game_state.game_parameters.board_size
+        line_state = game_state.line_state
 
-        # Calculate scores for each player based on the longest line
-        player_0_score = self.calculate_player_score(game_state, game_state.board, board_size, 0)
-        player_1_score = self.calculate_player_score(game_state, game_state.board, board_size, 1)
+        # Scores for each player based on the longest line, kept up to date by set_cell
+        player_0_score = line_state.get_score(0)
+        player_1_score = line_state.get_score(1)
 
         # Check for a winner
-        if self.check_for_win(game_state):
+        if line_state.has_win():
             # If there is a winner, significantly increase their score
             if game_state.current_turn == 0:
                 player_0_score += 1000000
             else:
                 player_1_score += 1000000
-        elif self.is_terminal(game_state):
+        elif line_state.is_full():
             # If the game has ended without a winner, set the scores to be equal (tie)
             player_0_score = 0
             player_1_score = 0
@@ -162,54 +286,36 @@ class MacoForwardModel(ForwardModel):
         return True
 
     def calculate_player_score(self, game_state, board, board_size, player):
-        """Calculates the score for a player based on the longest line."""
+        """Calculates the score for a player based on the longest line by scanning every scoring window of the board.
+        `step` keeps the same value up to date through `MacoLineState.get_score`."""
         max_line_length = 0
-        win_length = game_state.game_parameters.win_condition_length
+        windows = game_state.game_parameters.get_line_windows()
 
-        def check_direction(start_x, start_y, dx, dy):
+        for positions in windows.scoring_window_positions:
             consecutive_count = 0
-            empty_count = 0
-            x, y = start_x, start_y
-
-            while 0 <= x < board_size and 0 <= y < board_size:
-                if board[(x, y)] == player:
+            for position in positions:
+                value = board[position]
+                if value == player:
                     consecutive_count += 1
-                elif board[(x, y)] is None:
-                    empty_count += 1
-                else:
-                    break
-
-                if consecutive_count + empty_count >= win_length:
+                elif value is not None:
+                    # A window with an opponent piece can't become a line
+                    consecutive_count = 0
                     break
+            max_line_length = max(max_line_length, consecutive_count)
 
-                x += dx
-                y += dy
-
-            if consecutive_count > 0 and consecutive_count + empty_count >= win_length:
-                return consecutive_count
-            return 0
-
-        # Check vertical lines
-        for col in range(board_size):
-            for row in range(board_size):
-                max_line_length = max(max_line_length, check_direction(row, col, 1, 0))
-
-        # Check horizontal lines
-        for row in range(board_size):
-            for col in range(board_size):
-                max_line_length = max(max_line_length, check_direction(row, col, 0, 1))
-
-        # Check diagonal lines (top-left to bottom-right)
-        for i in range(board_size):
-            max_line_length = max(max_line_length, check_direction(i, 0, 1, 1))
-            max_line_length = max(max_line_length, check_direction(0, i, 1, 1))
+        return max_line_length
 
-        # Check diagonal lines (top-right to bottom-left)
-        for i in range(board_size):
-            max_line_length = max(max_line_length, check_direction(i, board_size - 1, 1, -1))
-            max_line_length = max(max_line_length, check_direction(0, i, 1, -1))
+    def calculate_scores(self, boards: np.ndarray, win_length: int) -> np.ndarray:
+        """Calculates the score of both players for an int8 board array or a stack of them in one vectorized call.
+        Returns an array of shape `(..., 2)` with the same values as `calculate_player_score`."""
+        return calculate_scores(boards, win_length)
 
-        return max_line_length
+    def calculate_player_scores(self, game_state: Union['MacoGameState', 'MacoObservation']) -> Tuple[int, int]:
+        """Calculates the score of both players from scratch with the vectorized kernel."""
+        board_size = game_state.game_parameters.board_size
+        scores = calculate_scores(board_to_array(game_state.board, board_size),
+                                  game_state.game_parameters.win_condition_length)
+        return int(scores[0]), int(scores[1])
 
     def give_invalid_action_penalty(self, game_state: Union['MacoGameState', 'MacoObservation']) -> None:
         """Applies a penalty score to the current player for an invalid action."""
@@ -1,5 +1,8 @@
-from typing import Optional
+from typing import Optional, Tuple
 from games import GameParameters
+from games.maco.maco_zobrist import MacoZobristTable, get_zobrist_table
+from games.maco.maco_line_windows import MacoLineWindows, get_line_windows
+from games.maco.maco_action import MacoAction, get_action_table
 
 class MacoGameParameters(GameParameters):
     def __init__(self,
@@ -9,7 +12,8 @@ class MacoGameParameters(GameParameters):
                  explode_per_player: int = 1,
                  block_per_player: int = 0,
                  win_condition_length: int = 6,
-                 seed: Optional[int] = None):
+                 seed: Optional[int] = None,
+                 use_bitboard: bool = False):
         self.board_size = board_size
         self.action_points_per_turn = action_points_per_turn
         self.pieces_per_player = pieces_per_player
@@ -17,6 +21,10 @@ class MacoGameParameters(GameParameters):
         self.block_per_player = block_per_player
         self.win_condition_length = win_condition_length
         self.seed = seed
+        self.use_bitboard = use_bitboard
+        self.zobrist_table: Optional['MacoZobristTable'] = None
+        self.line_windows: Optional['MacoLineWindows'] = None
+        self.action_table: Optional[Tuple[Tuple['MacoAction', ...], ...]] = None
 
     def get_board_size(self) -> int:
         return self.board_size
@@ -39,6 +47,36 @@ class MacoGameParameters(GameParameters):
     def get_seed(self) -> Optional[int]:
         return self.seed
 
+    def get_use_bitboard(self) -> bool:
+        return self.use_bitboard
+
+    def get_zobrist_table(self) -> 'MacoZobristTable':
+        """Returns the keys used to hash the positions of games with these parameters."""
+        if self.zobrist_table is None:
+            max_pieces = max(self.pieces_per_player, self.explode_per_player, self.block_per_player)
+            self.zobrist_table = get_zobrist_table(self.board_size, self.action_points_per_turn, max_pieces)
+        return self.zobrist_table
+
+    def get_line_windows(self) -> 'MacoLineWindows':
+        """Returns the precomputed line windows of boards with these parameters."""
+        if self.line_windows is None:
+            self.line_windows = get_line_windows(self.board_size, self.win_condition_length)
+        return self.line_windows
+
+    def get_action_table(self) -> Tuple[Tuple['MacoAction', ...], ...]:
+        """Returns the shared actions of boards with these parameters, see `get_action_table`."""
+        if self.action_table is None:
+            self.action_table = get_action_table(self.board_size)
+        return self.action_table
+
+    def __getstate__(self) -> dict:
+        # The cached tables are rebuilt on demand instead of being pickled with the parameters
+        state = self.__dict__.copy()
+        state['zobrist_table'] = None
+        state['line_windows'] = None
+        state['action_table'] = None
+        return state
+
     def __str__(self):
         return (
             f"MacoGameParameters("
@@ -48,5 +86,6 @@ class MacoGameParameters(GameParameters):
             f"explode_per_player={self.explode_per_player}, "
             f"block_per_player={self.block_per_player}, "
             f"win_condition_length={self.win_condition_length}, "
-            f"seed={self.seed})"
+            f"seed={self.seed}, "
+            f"use_bitboard={self.use_bitboard})"
         )
\ No newline at end of file
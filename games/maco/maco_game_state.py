@@ -1,10 +1,13 @@
 import copy
-from typing import Any, Dict, Tuple, Optional, Type
+from typing import Any, Dict, Tuple, Optional, Type, Union
 from games import GameState
 from games.maco.maco_piece import MacoPiece, MacoPieceType
 from games.maco.maco_game_parameters import MacoGameParameters
 from games.maco.maco_observation import MacoObservation
 from games.maco.maco_piece_collection import MacoPieceCollection
+from games.maco.maco_bitboard import MacoBitboard
+from games.maco.maco_line_state import MacoLineState
+from games.maco.maco_cell_set import MacoCellSet
 
 
 class MacoGameState(GameState):
@@ -12,12 +15,17 @@ class MacoGameState(GameState):
         self.game_parameters = game_parameters
         self.current_turn = 0
         self.action_points_left = game_parameters.action_points_per_turn
-        self.board = self.initialize_board_dict(self.game_parameters.board_size)
+        self.board = self.initialize_board(self.game_parameters.board_size)
+        self.empty_cells = self.initialize_empty_cells()
+        self.line_state = MacoLineState(self.game_parameters.board_size, self.game_parameters.win_condition_length)
         self.player_0_pieces = self.initialize_player_pieces(self.game_parameters.pieces_per_player)
         self.player_1_pieces = self.initialize_player_pieces(self.game_parameters.pieces_per_player)
         self.player_0_score = 0
         self.player_1_score = 0
         self.blocked_rows = {}
+        self.terminal = False
+        self.winner: Optional[int] = None
+        self.zobrist_key = self.game_parameters.get_zobrist_table().compute_key(self)
 
     # region Methods
     def get_observation(self) -> 'MacoObservation':
@@ -26,11 +34,16 @@ class MacoGameState(GameState):
     def reset(self) -> None:
         self.current_turn = 0
         self.action_points_left = self.game_parameters.action_points_per_turn
-        self.board = self.initialize_board_dict(self.game_parameters.board_size)
+        self.board = self.initialize_board(self.game_parameters.board_size)
+        self.empty_cells = self.initialize_empty_cells()
+        self.line_state = MacoLineState(self.game_parameters.board_size, self.game_parameters.win_condition_length)
         self.player_0_pieces = self.initialize_player_pieces(self.game_parameters.pieces_per_player)
         self.player_1_pieces = self.initialize_player_pieces(self.game_parameters.pieces_per_player)
         self.player_0_score = 0
         self.player_1_score = 0
+        self.terminal = False
+        self.winner = None
+        self.zobrist_key = self.game_parameters.get_zobrist_table().compute_key(self)
 
     def board_to_string(self) -> str:
         board_str = ""
@@ -52,17 +65,25 @@ class MacoGameState(GameState):
     # region Helpers
     def initialize_player_pieces(self, pieces_per_player: int) -> 'MacoPieceCollection':
         pieces = MacoPieceCollection()
-        for _ in range(pieces_per_player):
-            pieces.add_piece(MacoPiece(MacoPieceType.REGULAR))
-        for _ in range(self.game_parameters.explode_per_player):
-            pieces.add_piece(MacoPiece(MacoPieceType.EXPLODE))
-        for _ in range(self.game_parameters.block_per_player):
-            pieces.add_piece(MacoPiece(MacoPieceType.BLOCK))
+        pieces.add_pieces_of_type(MacoPieceType.REGULAR, pieces_per_player)
+        pieces.add_pieces_of_type(MacoPieceType.EXPLODE, self.game_parameters.explode_per_player)
+        pieces.add_pieces_of_type(MacoPieceType.BLOCK, self.game_parameters.block_per_player)
         return pieces
 
+    def initialize_board(self, board_size: int) -> Union[Dict[Tuple[int, int], Optional[int]], 'MacoBitboard']:
+        if self.game_parameters.use_bitboard:
+            return MacoBitboard(board_size)
+        return self.initialize_board_dict(board_size)
+
     def initialize_board_dict(self, board_size: int) -> Dict[Tuple[int, int], Optional[int]]:
         return {(i, j): None for i in range(board_size) for j in range(board_size)}
 
+    def initialize_empty_cells(self) -> 'MacoCellSet':
+        """Returns the indices `x * board_size + y` of the empty cells of the board."""
+        board_size = self.game_parameters.board_size
+        return MacoCellSet(board_size * board_size,
+                           sorted(x * board_size + y for (x, y), value in self.board.items() if value is None))
+
     # endregion
 
     # region Override
@@ -85,13 +106,18 @@ class MacoGameState(GameState):
         return {
             "current_turn": self.current_turn,
             "board": self.board.copy(),
+            "empty_cells": self.empty_cells.copy(),
+            "line_state": self.line_state.clone(),
             "player_0_score": self.player_0_score,
             "player_0_pieces": self.player_0_pieces.clone(),
             "player_1_score": self.player_1_score,
             "player_1_pieces": self.player_1_pieces.clone(),
             "action_points_left": self.action_points_left,
             "game_parameters": self.game_parameters,
-            "blocked_rows": self.blocked_rows.copy()
+            "blocked_rows": self.blocked_rows.copy(),
+            "zobrist_key": self.zobrist_key,
+            "terminal": self.terminal,
+            "winner": self.winner
         }
 
     def __str__(self):
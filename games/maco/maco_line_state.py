@@ -0,0 +1,120 @@
+from typing import List, Optional, Tuple
+from games.maco.maco_line_windows import MacoLineWindows, get_line_windows
+
+
+class MacoLineState:
+    """
+    Piece counts of every line window of a Maco board, kept up to date one cell at a time.
+
+    The windows are the ones of the shared `MacoLineWindows` table for the board size and line length. For each window
+    the state stores how many pieces each player has in it, a histogram of the windows that still count for each
+    player's score and the number of complete lines of each player. With these, the score, win and draw checks of
+    `MacoForwardModel` don't need to scan the board.
+    """
+    __slots__ = ('board_size', 'win_length', 'windows', 'counts', 'score_lines', 'winning_lines', 'empty_cells')
+
+    def __init__(self, board_size: int, win_length: int) -> None:
+        self.board_size = board_size
+        self.win_length = win_length
+        self.windows: 'MacoLineWindows' = get_line_windows(board_size, win_length)
+        windows = self.windows.get_window_count()
+        self.counts: List[List[int]] = [[0] * windows, [0] * windows]
+        self.score_lines: List[List[int]] = [[0] * (win_length + 1), [0] * (win_length + 1)]
+        self.winning_lines: List[int] = [0, 0]
+        self.empty_cells = board_size * board_size
+
+    # region Methods
+    def clone(self) -> 'MacoLineState':
+        """Returns a copy of the line state."""
+        new_line_state = MacoLineState.__new__(MacoLineState)
+        new_line_state.board_size = self.board_size
+        new_line_state.win_length = self.win_length
+        new_line_state.windows = self.windows
+        new_line_state.counts = [self.counts[0].copy(), self.counts[1].copy()]
+        new_line_state.score_lines = [self.score_lines[0].copy(), self.score_lines[1].copy()]
+        new_line_state.winning_lines = self.winning_lines.copy()
+        new_line_state.empty_cells = self.empty_cells
+        return new_line_state
+
+    def update_cell(self, position: Tuple[int, int], old_value: Optional[int], new_value: Optional[int]) -> None:
+        """Updates the windows through `position` after its content changed from `old_value` to `new_value`."""
+        if old_value == new_value:
+            return
+        if old_value is None:
+            self.empty_cells -= 1
+        elif new_value is None:
+            self.empty_cells += 1
+
+        x, y = position
+        cell_windows = self.windows.cell_windows[x * self.board_size + y]
+        if old_value is not None:
+            self.add_to_windows(cell_windows, old_value, -1)
+        if new_value is not None:
+            self.add_to_windows(cell_windows, new_value, 1)
+
+    def add_to_windows(self, cell_windows: Tuple[Tuple[int, bool], ...], player: int, delta: int) -> None:
+        """Adds `delta` pieces of `player` to each `(window, scoring)` pair, keeping the score histograms and winning line
+        counts in sync. The loop is inlined since it runs for every changed cell of every step and unstep."""
+        win_length = self.win_length
+        own_counts = self.counts[player]
+        other_counts = self.counts[1 - player]
+        own_lines = self.score_lines[player]
+        other_lines = self.score_lines[1 - player]
+        for window, scoring in cell_windows:
+            own = own_counts[window]
+            other = other_counts[window]
+            if scoring:
+                if other == 0 and own > 0:
+                    own_lines[own] -= 1
+                elif own == 0 and other > 0:
+                    other_lines[other] -= 1
+            if own == win_length:
+                self.winning_lines[player] -= 1
+
+            own += delta
+            own_counts[window] = own
+
+            if own == win_length:
+                self.winning_lines[player] += 1
+            if scoring:
+                if other == 0 and own > 0:
+                    own_lines[own] += 1
+                elif own == 0 and other > 0:
+                    other_lines[other] += 1
+    # endregion
+
+    # region Getters
+    def get_score(self, player: int) -> int:
+        """Returns the amount of pieces of the player in its best window that has no opponent piece."""
+        score_lines = self.score_lines[player]
+        for count in range(self.win_length, 0, -1):
+            if score_lines[count] > 0:
+                return count
+        return 0
+
+    def has_win(self) -> bool:
+        """Returns whether any player has a complete line."""
+        return self.winning_lines[0] > 0 or self.winning_lines[1] > 0
+
+    def get_winning_lines(self, player: int) -> int:
+        """Returns the amount of complete lines of the player."""
+        return self.winning_lines[player]
+
+    def is_full(self) -> bool:
+        """Returns whether every cell of the board is occupied."""
+        return self.empty_cells == 0
+
+    def get_empty_cells(self) -> int:
+        """Returns the amount of empty cells of the board."""
+        return self.empty_cells
+    # endregion
+
+    # region Override
+    def __getstate__(self) -> tuple:
+        # The shared windows are looked up again when unpickling instead of being pickled with every state
+        return self.board_size, self.win_length, self.counts, self.score_lines, self.winning_lines, self.empty_cells
+
+    def __setstate__(self, state: tuple) -> None:
+        self.board_size, self.win_length, self.counts, self.score_lines, self.winning_lines, self.empty_cells = state
+        self.windows = get_line_windows(self.board_size, self.win_length)
+    # endregion
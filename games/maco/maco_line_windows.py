@@ -0,0 +1,82 @@
+from functools import lru_cache
+from typing import List, Tuple
+import numpy as np
+
+DIRECTIONS: Tuple[Tuple[int, int], ...] = ((1, 0), (0, 1), (1, 1), (1, -1))
+
+
+class MacoLineWindows:
+    """
+    Precomputed line windows of a Maco board.
+
+    A window is a run of `win_length` cells in one of the four `DIRECTIONS` that fits inside the board. Windows are
+    numbered in the order of their start cell and direction, and cells are numbered `x * board_size + y`.
+
+    Attributes:
+        board_size (int): Size of the board.
+        win_length (int): Amount of cells of each window.
+        positions (List[Tuple[int, int]]): Position of each cell index.
+        window_cells (np.ndarray): `(windows, win_length)` array with the cell indices of each window.
+        window_scoring (np.ndarray): Boolean array with whether each window counts towards the score.
+        cell_window_offsets (np.ndarray): Start of the windows of each cell in `cell_window_ids`; the windows of cell
+            `c` are `cell_window_ids[cell_window_offsets[c]:cell_window_offsets[c + 1]]`.
+        cell_window_ids (np.ndarray): Windows through each cell, grouped by cell.
+        cell_windows (List[Tuple[Tuple[int, bool], ...]]): `(window, scoring)` pairs through each cell as Python
+            objects, for the scalar code paths that would pay for NumPy scalar access.
+        scoring_window_positions (List[Tuple[Tuple[int, int], ...]]): Positions of the cells of each scoring window.
+    """
+
+    def __init__(self, board_size: int, win_length: int) -> None:
+        self.board_size = board_size
+        self.win_length = win_length
+        self.positions = [(x, y) for x in range(board_size) for y in range(board_size)]
+
+        window_cells: List[List[int]] = []
+        window_scoring: List[bool] = []
+        for x in range(board_size):
+            for y in range(board_size):
+                for dx, dy in DIRECTIONS:
+                    end_x, end_y = x + (win_length - 1) * dx, y + (win_length - 1) * dy
+                    if not (0 <= end_x < board_size and 0 <= end_y < board_size):
+                        continue
+                    window_cells.append([(x + i * dx) * board_size + y + i * dy for i in range(win_length)])
+                    window_scoring.append(self.is_scoring_start(x, y, dx, dy))
+
+        self.window_cells = np.array(window_cells, dtype=np.int32).reshape(len(window_cells), win_length)
+        self.window_scoring = np.array(window_scoring, dtype=bool)
+
+        cell_windows: List[List[int]] = [[] for _ in range(board_size * board_size)]
+        for window, cells in enumerate(window_cells):
+            for cell in cells:
+                cell_windows[cell].append(window)
+        self.cell_window_offsets = np.cumsum([0] + [len(windows) for windows in cell_windows], dtype=np.int32)
+        self.cell_window_ids = np.array([window for windows in cell_windows for window in windows], dtype=np.int32)
+
+        self.cell_windows = [tuple((window, window_scoring[window]) for window in windows) for windows in cell_windows]
+        self.scoring_window_positions = [tuple(self.positions[cell] for cell in cells)
+                                         for cells, scoring in zip(window_cells, window_scoring) if scoring]
+
+    # region Methods
+    def is_scoring_start(self, start_x: int, start_y: int, dx: int, dy: int) -> bool:
+        """Returns whether a window counts towards the score. `MacoForwardModel.calculate_player_score` only walks the
+        diagonals from the board edges, so diagonal windows only count when they start on the first row or on the
+        edge column the diagonal starts from."""
+        if dx == 0 or dy == 0:
+            return True
+        return start_x == 0 or start_y == (0 if dy == 1 else self.board_size - 1)
+    # endregion
+
+    # region Getters
+    def get_window_count(self) -> int:
+        return len(self.window_scoring)
+
+    def get_windows_of_cell(self, cell: int) -> np.ndarray:
+        """Returns the indices of the windows through a cell."""
+        return self.cell_window_ids[self.cell_window_offsets[cell]:self.cell_window_offsets[cell + 1]]
+    # endregion
+
+
+@lru_cache(maxsize=None)
+def get_line_windows(board_size: int, win_length: int) -> 'MacoLineWindows':
+    """Returns the line windows for the given board size and line length, built once per pair."""
+    return MacoLineWindows(board_size, win_length)
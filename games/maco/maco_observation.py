@@ -1,46 +1,68 @@
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Hashable, List, Optional, Tuple
 from games import Observation
 from games.maco.maco_piece import MacoPiece, MacoPieceType
 from games.maco.maco_action import MacoAction
 from games.maco.maco_game_parameters import MacoGameParameters
+from games.maco.maco_cell_set import MacoCellSet
 import random
 
+REGULAR_INDEX = list(MacoPieceType).index(MacoPieceType.REGULAR)
+"""Index of the regular piece actions in each cell of the action table."""
+
+
 class MacoObservation(Observation):
     def __init__(self, game_state_info: Dict[str, Any]):
         if game_state_info is not None:
             self.game_parameters: 'MacoGameParameters' = game_state_info["game_parameters"]
             self.current_turn = game_state_info['current_turn']
             self.board = game_state_info['board']
+            self.empty_cells: 'MacoCellSet' = game_state_info['empty_cells']
+            self.line_state = game_state_info['line_state']
             self.action_points_left = game_state_info['action_points_left']
             self.player_0_pieces = game_state_info['player_0_pieces']
             self.player_1_pieces = game_state_info['player_1_pieces']
             self.player_0_score = game_state_info['player_0_score']
             self.player_1_score = game_state_info['player_1_score']
             self.blocked_rows = game_state_info['blocked_rows']
+            self.zobrist_key = game_state_info['zobrist_key']
+            self.terminal: bool = game_state_info['terminal']
+            self.winner: Optional[int] = game_state_info['winner']
 
     def clone(self) -> 'MacoObservation':
+        Observation.clones += 1
         new_observation = MacoObservation(None)
         new_observation.game_parameters = self.game_parameters
         new_observation.current_turn = self.current_turn
         new_observation.board = self.board.copy()
+        new_observation.empty_cells = self.empty_cells.copy()
+        new_observation.line_state = self.line_state.clone()
         new_observation.action_points_left = self.action_points_left
         new_observation.player_0_pieces = self.player_0_pieces.clone()
         new_observation.player_1_pieces = self.player_1_pieces.clone()
         new_observation.player_0_score = self.player_0_score
         new_observation.player_1_score = self.player_1_score
         new_observation.blocked_rows = self.blocked_rows.copy()
+        new_observation.zobrist_key = self.zobrist_key
+        new_observation.terminal = self.terminal
+        new_observation.winner = self.winner
         return new_observation
 
     def copy_into(self, other: 'MacoObservation') -> None:
+        Observation.clones += 1
         other.game_parameters = self.game_parameters
         other.current_turn = self.current_turn
         other.board = self.board.copy()
+        other.empty_cells = self.empty_cells.copy()
+        other.line_state = self.line_state.clone()
         other.action_points_left = self.action_points_left
         other.player_0_pieces = self.player_0_pieces.clone()
         other.player_1_pieces = self.player_1_pieces.clone()
         other.player_0_score = self.player_0_score
         other.player_1_score = self.player_1_score
         other.blocked_rows = self.blocked_rows.copy()
+        other.zobrist_key = self.zobrist_key
+        other.terminal = self.terminal
+        other.winner = self.winner
 
     def is_action_valid(self, action: 'MacoAction') -> bool:
         pieces = self.player_0_pieces if self.current_turn == 0 else self.player_1_pieces
@@ -54,45 +76,49 @@ class MacoObservation(Observation):
         return self.board[position] is None
 
     def get_actions(self) -> List['MacoAction']:
-        actions = []
+        """Returns the actions for every empty cell and available piece type, in row-major order. The actions come from
+        the shared action table of the game parameters and must not be modified."""
         pieces = self.player_0_pieces if self.current_turn == 0 else self.player_1_pieces
+        available_types = [index for index, piece_type in enumerate(MacoPieceType) if pieces.has_piece(piece_type)]
+        action_table = self.game_parameters.get_action_table()
 
         # Generate actions for each empty position
-        for position in self.get_empty_positions():
-            # Generate actions for regular pieces
-            regular_pieces = pieces.get_regular_pieces()
-            if regular_pieces:
-                piece = regular_pieces[0]
-                actions.append(MacoAction(piece, position))
-
-            # Generate actions for explode pieces
-            explode_pieces = pieces.get_explode_pieces()
-            if explode_pieces:
-                piece = explode_pieces[0]
-                actions.append(MacoAction(piece, position))
-
-            # Generate actions for block pieces
-            block_pieces = pieces.get_block_pieces()
-            if block_pieces:
-                piece = block_pieces[0]
-                actions.append(MacoAction(piece, position))
-
-        return actions
-
-    def get_random_action(self) -> 'MacoAction':
-        actions = self.get_actions()
-        regular_actions = [action for action in actions if action.get_piece().get_piece_type() == MacoPieceType.REGULAR]
-        if not regular_actions:
+        return [action_table[cell][index] for cell in sorted(self.empty_cells) for index in available_types]
+
+    def get_random_action(self, rng: Optional[random.Random] = None) -> 'MacoAction':
+        """Returns a regular piece action on a uniformly random empty cell, or None if there is none. The cell is drawn
+        from the maintained empty cells in constant time, with `rng` or the `random` module if it is not given."""
+        pieces = self.player_0_pieces if self.current_turn == 0 else self.player_1_pieces
+        if not self.empty_cells or not pieces.has_piece(MacoPieceType.REGULAR):
             return None
-        return random.choice(regular_actions)
+        cell = self.empty_cells.choice(rng if rng is not None else random)
+        return self.game_parameters.get_action_table()[cell][REGULAR_INDEX]
 
     def get_empty_positions(self) -> List[Tuple[int, int]]:
-        empty_positions = []
-        for i in range(self.game_parameters.board_size):
-            for j in range(self.game_parameters.board_size):
-                if self.board[(i, j)] is None:
-                    empty_positions.append((i, j))
-        return empty_positions
+        board_size = self.game_parameters.board_size
+        return [divmod(cell, board_size) for cell in sorted(self.empty_cells)]
+
+    def get_key(self) -> Hashable:
+        """Returns the Zobrist key of the position, kept up to date by `MacoForwardModel`."""
+        return self.zobrist_key
+
+    def get_turn_key(self, actions: List['MacoAction']) -> Hashable:
+        """Returns the sorted cells of the actions if they are regular pieces on distinct cells that are empty and not
+        blocked here, as such placements reach the same position in any order. Otherwise explode and block pieces or
+        invalid placements make the order matter, and the key is the actions in order."""
+        board_size = self.game_parameters.board_size
+        cells = []
+        for action in actions:
+            if action is None or action.get_piece().get_piece_type() != MacoPieceType.REGULAR:
+                return tuple(actions)
+            position = action.get_position()
+            if self.board[position] is not None or position[0] in self.blocked_rows:
+                return tuple(actions)
+            cells.append(position[0] * board_size + position[1])
+        cells.sort()
+        if any(cells[i] == cells[i + 1] for i in range(len(cells) - 1)):
+            return tuple(actions)
+        return tuple(cells)
 
     def get_game_parameters(self) -> 'MacoGameParameters':
         return self.game_parameters
@@ -100,6 +126,13 @@ class MacoObservation(Observation):
     def get_current_turn(self) -> int:
         return self.current_turn
 
+    def get_is_terminal(self) -> bool:
+        return self.terminal
+
+    def get_winner(self) -> Optional[int]:
+        """Returns the player that won, -1 for a draw or None if the game is not over."""
+        return self.winner
+
     def get_action_points_left(self) -> int:
         return self.action_points_left
 
@@ -134,25 +167,7 @@ class MacoObservation(Observation):
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, MacoObservation):
             return False
-        return (
-            self.game_parameters == other.game_parameters and
-            self.current_turn == other.current_turn and
-            self.board == other.board and
-            self.action_points_left == other.action_points_left and
-            self.player_0_pieces == other.player_0_pieces and
-            self.player_1_pieces == other.player_1_pieces and
-            self.player_0_score == other.player_0_score and
-            self.player_1_score == other.player_1_score
-        )
+        return self.zobrist_key == other.zobrist_key and self.game_parameters == other.game_parameters
 
     def __hash__(self) -> int:
-        return hash((
-            self.game_parameters,
-            self.current_turn,
-            tuple(tuple(row) for row in self.board),
-            self.action_points_left,
-            self.player_0_pieces,
-            self.player_1_pieces,
-            self.player_0_score,
-            self.player_1_score
-        ))
\ No newline at end of file
+        return self.zobrist_key
@@ -1,78 +1,83 @@
-from typing import List, Tuple
-from collections import defaultdict
+from typing import Dict, List, Tuple
 from games.maco.maco_piece import MacoPiece, MacoPieceType
 
 class MacoPieceCollection:
+    """Inventory of the pieces of a player, stored as the amount of pieces of each `MacoPieceType`. Pieces in the
+    inventory have no position, so the list views rebuild them as `MacoPiece` objects without one."""
     def __init__(self):
-        self.pieces: List['MacoPiece'] = []
+        self.counts: Dict['MacoPieceType', int] = {piece_type: 0 for piece_type in MacoPieceType}
 
     def clone(self) -> 'MacoPieceCollection':
-        """Creates a deep copy of the `MacoPieceCollection` and returns it."""
-        new_piece_collection = MacoPieceCollection()
-
-        for piece in self.pieces:
-            new_piece_collection.add_piece(piece.clone())
-
+        """Creates a copy of the `MacoPieceCollection` and returns it."""
+        new_piece_collection = MacoPieceCollection.__new__(MacoPieceCollection)
+        new_piece_collection.counts = self.counts.copy()
         return new_piece_collection
 
     def copy_into(self, other: 'MacoPieceCollection') -> None:
-        """Deep copies the `MacoPieceCollection` contents into another one."""
-        if len(self) >= len(other):
-            for piece_index in range(len(other)):
-                self.get_piece(piece_index).copy_into(other.get_piece(piece_index))
-
-            for piece in range(len(other), len(self.pieces)):
-                other.add_piece(self.pieces[piece].clone())
-
-        else:
-            del other.pieces[len(self):]
-            for piece_index in range(len(self)):
-                self.get_piece(piece_index).copy_into(other.get_piece(piece_index))
+        """Copies the `MacoPieceCollection` contents into another one."""
+        other.counts = self.counts.copy()
 
     def add_piece(self, piece: 'MacoPiece') -> None:
-        self.pieces.append(piece)
+        self.counts[piece.get_piece_type()] += 1
 
     def add_pieces(self, pieces: List['MacoPiece']) -> None:
-        self.pieces.extend(pieces)
+        for piece in pieces:
+            self.add_piece(piece)
+
+    def add_pieces_of_type(self, piece_type: 'MacoPieceType', amount: int) -> None:
+        self.counts[piece_type] += amount
 
     def remove_piece(self, piece: 'MacoPiece') -> None:
-        if piece in self.pieces:
-            self.pieces.remove(piece)
+        piece_type = piece.get_piece_type()
+        if self.counts[piece_type] > 0:
+            self.counts[piece_type] -= 1
 
     def remove_pieces_in_position(self, pos: Tuple[int, int]) -> None:
-        self.pieces = [piece for piece in self.pieces if piece.get_pos() != pos]
+        if pos is None:
+            for piece_type in self.counts:
+                self.counts[piece_type] = 0
 
     def get_piece(self, index: int) -> 'MacoPiece':
         """Returns the `MacoPiece` contained in the `MacoPieceCollection` at the specified index."""
-        return self.pieces[index]
+        return self.get_pieces()[index]
 
     def get_pieces(self) -> List['MacoPiece']:
-        return self.pieces
+        return [MacoPiece(piece_type) for piece_type, amount in self.counts.items() for _ in range(amount)]
+
+    def get_amount(self, piece_type: 'MacoPieceType') -> int:
+        """Returns the amount of pieces of the given type."""
+        return self.counts[piece_type]
+
+    def has_piece(self, piece_type: 'MacoPieceType') -> bool:
+        """Returns whether there is at least one piece of the given type."""
+        return self.counts[piece_type] > 0
 
     def get_regular_pieces(self) -> List['MacoPiece']:
-        return [piece for piece in self.pieces if piece.get_piece_type() == MacoPieceType.REGULAR]
+        return [MacoPiece(MacoPieceType.REGULAR) for _ in range(self.counts[MacoPieceType.REGULAR])]
 
     def get_explode_pieces(self) -> List['MacoPiece']:
-        return [piece for piece in self.pieces if piece.get_piece_type() == MacoPieceType.EXPLODE]
+        return [MacoPiece(MacoPieceType.EXPLODE) for _ in range(self.counts[MacoPieceType.EXPLODE])]
 
     def get_block_pieces(self) -> List['MacoPiece']:
-        return [piece for piece in self.pieces if piece.get_piece_type() == MacoPieceType.BLOCK]
+        return [MacoPiece(MacoPieceType.BLOCK) for _ in range(self.counts[MacoPieceType.BLOCK])]
 
     def get_piece_in_position(self, pos: Tuple[int, int]) -> 'MacoPiece':
-        pieces = [piece for piece in self.pieces if piece.get_pos() == pos]
+        if pos is not None:
+            return None
+        pieces = self.get_pieces()
         return pieces[0] if pieces else None
 
     def get_regular_positions(self) -> List[Tuple[int, int]]:
-        return [piece.get_pos() for piece in self.pieces if piece.get_piece_type() == MacoPieceType.REGULAR]
+        return [None] * self.counts[MacoPieceType.REGULAR]
 
     def get_explode_positions(self) -> List[Tuple[int, int]]:
-        return [piece.get_pos() for piece in self.pieces if piece.get_piece_type() == MacoPieceType.EXPLODE]
+        return [None] * self.counts[MacoPieceType.EXPLODE]
 
     def get_block_positions(self) -> List[Tuple[int, int]]:
-        return [piece.get_pos() for piece in self.pieces if piece.get_piece_type() == MacoPieceType.BLOCK]
+        return [None] * self.counts[MacoPieceType.BLOCK]
 
     def __len__(self):
-        return len(self.pieces)
+        return sum(self.counts.values())
 
     def __str__(self) -> str:
         return f"Regular: {self.get_regular_positions()}, Explode: {self.get_explode_positions()}, Block: {self.get_block_positions()}"
@@ -80,11 +85,7 @@ class MacoPieceCollection:
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, MacoPieceCollection):
             return False
-        return self.pieces == other.pieces
+        return self.counts == other.counts
 
     def __hash__(self) -> int:
-        piece_dict = defaultdict(int)
-        for piece in self.pieces:
-            piece_dict[piece] += 1
-        hashed = "".join([str(piece.__hash__()) + str(piece_dict[piece]) for piece in piece_dict])
-        return hash(hashed)
+        return hash(tuple(self.counts.values()))
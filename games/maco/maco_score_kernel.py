@@ -0,0 +1,60 @@
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+
+from games.maco.maco_bitboard import MacoBitboard
+
+EMPTY_CELL = -1
+"""Value used for empty cells in the int8 board arrays."""
+
+
+def board_to_array(board: Union[Dict[Tuple[int, int], Optional[int]], 'MacoBitboard'], board_size: int) -> np.ndarray:
+    """Returns the board as a `(board_size, board_size)` int8 array with the owner of each cell or `EMPTY_CELL`."""
+    array = np.full((board_size, board_size), EMPTY_CELL, dtype=np.int8)
+    for (x, y), value in board.items():
+        if value is not None:
+            array[x, y] = value
+    return array
+
+
+def window_sums(cells: np.ndarray, win_length: int) -> np.ndarray:
+    """Returns the sums of `cells` over every scoring window as an array of shape `(..., windows)`.
+
+    The scoring windows are the ones `MacoForwardModel.calculate_player_score` looks at: every horizontal and vertical
+    window, and the first window of each diagonal starting from the board edges. Each group of windows is computed as a
+    sliding sum of `win_length` shifted slices along its direction.
+    """
+    board_size = cells.shape[-1]
+    starts = board_size - win_length + 1
+    if starts <= 0:
+        return np.zeros(cells.shape[:-2] + (0,), dtype=np.int16)
+
+    cells = cells.astype(np.int16, copy=False)
+    rows = sum(cells[..., :, i:i + starts] for i in range(win_length))
+    columns = sum(cells[..., i:i + starts, :] for i in range(win_length))
+    # diagonals (top-left to bottom-right) starting on the first column and on the first row
+    diagonals_left = sum(cells[..., i:i + starts, i] for i in range(win_length))
+    diagonals_top = sum(cells[..., i, i:i + starts] for i in range(win_length))
+    # diagonals (top-right to bottom-left) starting on the last column and on the first row
+    anti_diagonals_right = sum(cells[..., i:i + starts, board_size - 1 - i] for i in range(win_length))
+    anti_diagonals_top = sum(cells[..., i, win_length - 1 - i:win_length - 1 - i + starts] for i in range(win_length))
+
+    batch_shape = cells.shape[:-2]
+    groups: List[np.ndarray] = [rows, columns, diagonals_left, diagonals_top, anti_diagonals_right, anti_diagonals_top]
+    return np.concatenate([group.reshape(batch_shape + (-1,)) for group in groups], axis=-1)
+
+
+def calculate_scores(boards: np.ndarray, win_length: int) -> np.ndarray:
+    """Returns the score of both players for a board or a stack of boards.
+
+    `boards` is an int8 array of shape `(..., board_size, board_size)` as returned by `board_to_array`. The result has
+    shape `(..., 2)`, with the length of the longest viable line of player 0 and player 1, as computed by
+    `MacoForwardModel.calculate_player_score`.
+    """
+    player_0_sums = window_sums(boards == 0, win_length)
+    player_1_sums = window_sums(boards == 1, win_length)
+    if player_0_sums.shape[-1] == 0:
+        return np.zeros(boards.shape[:-2] + (2,), dtype=np.int16)
+
+    player_0_score = np.where(player_1_sums == 0, player_0_sums, 0).max(axis=-1)
+    player_1_score = np.where(player_0_sums == 0, player_1_sums, 0).max(axis=-1)
+    return np.stack([player_0_score, player_1_score], axis=-1)
@@ -0,0 +1,142 @@
+from functools import lru_cache
+from typing import List, Optional, Union
+import struct
+
+from games.maco.maco_piece import MacoPiece, MacoPieceType
+from games.maco.maco_action import MacoAction
+from games.maco.maco_game_parameters import MacoGameParameters
+from games.maco.maco_observation import MacoObservation
+from games.maco.maco_game_state import MacoGameState
+from games.maco.maco_forward_model import MacoForwardModel
+
+FORMAT_VERSION = 1
+"""Version of the encoding, stored in the first byte of every encoded observation."""
+
+PIECE_TYPES = tuple(MacoPieceType)
+
+OBSERVATION_HEADER = struct.Struct('<BBBBBHHH?qBhqq?b6H')
+"""Fixed part of an encoded observation: version, board size, action points per turn, win condition length, use
+bitboard, pieces, explode and block per player, has seed, seed, current turn, action points left, scores of both players,
+terminal, winner (-2 if the game is not over) and the amount of pieces of each type of both players. It is followed by
+one signed byte per cell (`x * board_size + y`, -1 if empty) and one byte per row with the turns it stays blocked."""
+
+ACTION = struct.Struct('<bbB')
+"""Encoded action: x and y (-1 if the action has no position) and the index of the piece type in `MacoPieceType`."""
+
+ACTION_COUNT = struct.Struct('<H')
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+EMPTY = -1
+NO_WINNER = -2
+
+
+def get_observation_size(board_size: int) -> int:
+    """Returns the amount of bytes of an encoded observation for the given board size."""
+    return OBSERVATION_HEADER.size + board_size * board_size + board_size
+
+
+def encode_observation(observation: Union['MacoGameState', 'MacoObservation']) -> bytes:
+    """Encodes a state or observation into `get_observation_size(board_size)` bytes."""
+    parameters = observation.game_parameters
+    board_size = parameters.board_size
+    data = bytearray(get_observation_size(board_size))
+    pieces = [pieces.get_amount(piece_type) for pieces in [observation.player_0_pieces, observation.player_1_pieces]
+              for piece_type in PIECE_TYPES]
+    OBSERVATION_HEADER.pack_into(
+        data, 0, FORMAT_VERSION, board_size, parameters.action_points_per_turn, parameters.win_condition_length,
+        parameters.use_bitboard, parameters.pieces_per_player, parameters.explode_per_player,
+        parameters.block_per_player, parameters.seed is not None, parameters.seed or 0, observation.current_turn,
+        observation.action_points_left, observation.player_0_score, observation.player_1_score, observation.terminal,
+        NO_WINNER if observation.winner is None else observation.winner, *pieces)
+
+    offset = OBSERVATION_HEADER.size
+    for (x, y), value in observation.board.items():
+        data[offset + x * board_size + y] = EMPTY & 0xFF if value is None else value
+    offset += board_size * board_size
+    for row, duration in observation.blocked_rows.items():
+        data[offset + row] = duration
+    return bytes(data)
+
+
+def decode_observation(data: BytesLike, offset: int = 0) -> 'MacoObservation':
+    """Decodes an observation written by `encode_observation` at `offset` of `data`. The bytes are read through a
+    `memoryview` without copying them, and the line state, empty cells and Zobrist key are rebuilt from the board."""
+    view = memoryview(data)
+    (version, board_size, action_points_per_turn, win_condition_length, use_bitboard, pieces_per_player,
+     explode_per_player, block_per_player, has_seed, seed, current_turn, action_points_left, player_0_score,
+     player_1_score, terminal, winner, *pieces) = OBSERVATION_HEADER.unpack_from(view, offset)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported observation format version {version}")
+
+    parameters = get_decoded_parameters(board_size, action_points_per_turn, pieces_per_player, explode_per_player,
+                                        block_per_player, win_condition_length, seed if has_seed else None,
+                                        bool(use_bitboard))
+    observation = MacoGameState(parameters).get_observation()
+    forward_model = MacoForwardModel()
+
+    offset += OBSERVATION_HEADER.size
+    cells = view[offset:offset + board_size * board_size].cast('b')
+    for cell, value in enumerate(cells):
+        if value != EMPTY:
+            forward_model.set_cell(observation, divmod(cell, board_size), value)
+    offset += board_size * board_size
+    for row, duration in enumerate(view[offset:offset + board_size]):
+        if duration > 0:
+            forward_model.set_blocked_row(observation, row, duration)
+
+    for player, player_pieces in enumerate([observation.player_0_pieces, observation.player_1_pieces]):
+        for index, piece_type in enumerate(PIECE_TYPES):
+            player_pieces.counts[piece_type] = pieces[player * len(PIECE_TYPES) + index]
+    observation.current_turn = current_turn
+    observation.action_points_left = action_points_left
+    observation.player_0_score = player_0_score
+    observation.player_1_score = player_1_score
+    observation.terminal = terminal
+    observation.winner = None if winner == NO_WINNER else winner
+    observation.zobrist_key = parameters.get_zobrist_table().compute_key(observation)
+    return observation
+
+
+def encode_action(action: Optional['MacoAction']) -> bytes:
+    """Encodes an action into `ACTION.size` bytes. A missing action is encoded as a regular piece without position."""
+    if action is None:
+        return ACTION.pack(-1, -1, PIECE_TYPES.index(MacoPieceType.REGULAR))
+    position = action.get_position()
+    x, y = position if position is not None else (-1, -1)
+    return ACTION.pack(x, y, PIECE_TYPES.index(action.get_piece().get_piece_type()))
+
+
+def decode_action(data: BytesLike, offset: int = 0,
+                  game_parameters: Optional['MacoGameParameters'] = None) -> 'MacoAction':
+    """Decodes an action written by `encode_action`. If `game_parameters` is given, actions with a position are taken
+    from its shared action table instead of being created."""
+    x, y, piece_index = ACTION.unpack_from(data, offset)
+    if x < 0:
+        return MacoAction(MacoPiece(PIECE_TYPES[piece_index]), None)
+    if game_parameters is not None:
+        return game_parameters.get_action_table()[x * game_parameters.board_size + y][piece_index]
+    return MacoAction(MacoPiece(PIECE_TYPES[piece_index]), (x, y))
+
+
+def encode_actions(actions: List[Optional['MacoAction']]) -> bytes:
+    """Encodes a sequence of actions, such as a turn or a replay, prefixed by its length."""
+    return ACTION_COUNT.pack(len(actions)) + b''.join(encode_action(action) for action in actions)
+
+
+def decode_actions(data: BytesLike, offset: int = 0,
+                   game_parameters: Optional['MacoGameParameters'] = None) -> List['MacoAction']:
+    """Decodes a sequence of actions written by `encode_actions`."""
+    view = memoryview(data)
+    count, = ACTION_COUNT.unpack_from(view, offset)
+    offset += ACTION_COUNT.size
+    return [decode_action(view, offset + index * ACTION.size, game_parameters) for index in range(count)]
+
+
+@lru_cache(maxsize=None)
+def get_decoded_parameters(board_size: int, action_points_per_turn: int, pieces_per_player: int,
+                           explode_per_player: int, block_per_player: int, win_condition_length: int,
+                           seed: Optional[int], use_bitboard: bool) -> 'MacoGameParameters':
+    """Returns the parameters of decoded observations, shared by every observation decoded with the same values."""
+    return MacoGameParameters(board_size, action_points_per_turn, pieces_per_player, explode_per_player,
+                              block_per_player, win_condition_length, seed, use_bitboard)
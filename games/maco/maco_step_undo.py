@@ -0,0 +1,44 @@
+from typing import List, Optional, Tuple, Union
+from games.maco.maco_piece_type import MacoPieceType
+
+
+class MacoStepUndo:
+    """
+    Record of the changes made by one `MacoForwardModel.step_with_undo` call, used by `MacoForwardModel.unstep` to
+    restore the previous state.
+
+    Attributes:
+        valid (bool): Whether the step was valid, that is, what `MacoForwardModel.step` would have returned.
+        action_points_left (int): Action points left before the step.
+        player_0_score (int): Score of player 0 before the step.
+        player_1_score (int): Score of player 1 before the step.
+        cells (List[Tuple[Tuple[int, int], Optional[int], int]]): Previous content of each cell changed by the step and
+            its previous place in the empty cells (-1 if it was not empty), in the order they were changed. `unstep`
+            reverts them in reverse order, updating the line state cell by cell and restoring the order of the empty
+            cells, so random choices among them repeat after the step is reverted.
+        removed_piece_type (Optional[MacoPieceType]): Type of the piece removed from the current player, if any.
+        blocked_row (Optional[int]): Row blocked by the step, if any.
+        blocked_row_duration (Optional[int]): Previous duration of the blocked row, or None if it was not blocked.
+        zobrist_key (int): Zobrist key before the step.
+        terminal (bool): Terminal status before the step.
+        winner (Optional[int]): Winner before the step.
+    """
+    __slots__ = ('valid', 'action_points_left', 'player_0_score', 'player_1_score', 'cells', 'removed_piece_type', 'blocked_row', 'blocked_row_duration', 'zobrist_key',
+                 'terminal', 'winner')
+
+    def __init__(self, game_state: Union['MacoGameState', 'MacoObservation']) -> None:
+        self.valid = False
+        self.action_points_left = game_state.action_points_left
+        self.player_0_score = game_state.player_0_score
+        self.player_1_score = game_state.player_1_score
+        self.cells: List[Tuple[Tuple[int, int], Optional[int], int]] = []
+        self.removed_piece_type: Optional['MacoPieceType'] = None
+        self.blocked_row: Optional[int] = None
+        self.blocked_row_duration: Optional[int] = None
+        self.zobrist_key: int = game_state.zobrist_key
+        self.terminal: bool = game_state.terminal
+        self.winner: Optional[int] = game_state.winner
+
+    def is_valid(self) -> bool:
+        """Returns whether the recorded step was valid."""
+        return self.valid
@@ -0,0 +1,88 @@
+from functools import lru_cache
+from typing import Optional, Union
+import random
+
+from games.maco.maco_piece_type import MacoPieceType
+
+ZOBRIST_SEED = 0x3A0C0
+"""Seed of the random keys, fixed so that keys are the same in every process."""
+
+MASK_64 = (1 << 64) - 1
+
+
+def splitmix64(value: int) -> int:
+    """Returns a 64 bits pseudo-random number derived from `value`."""
+    value = (value + 0x9E3779B97F4A7C15) & MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
+
+
+class MacoZobristTable:
+    """
+    Random 64 bits keys used to hash Maco positions. The key of a position is the XOR of the keys of the content of
+    every cell, the current turn, the action points left, the blocked rows and the amount of pieces of each type left to
+    each player, so the forward model can update it incrementally when any of them changes.
+
+    Values outside the ranges of the tables (for example more action points than the ones given per turn) get a key
+    derived with `splitmix64`, so every value has a key.
+    """
+
+    def __init__(self, board_size: int, action_points_per_turn: int, max_pieces: int) -> None:
+        rng = random.Random(ZOBRIST_SEED)
+        self.board_size = board_size
+        self.cells = [(rng.getrandbits(64), rng.getrandbits(64)) for _ in range(board_size * board_size)]
+        self.turn = rng.getrandbits(64)
+        self.action_points = [rng.getrandbits(64) for _ in range(action_points_per_turn + 1)]
+        self.blocked_rows = [[rng.getrandbits(64) for _ in range(action_points_per_turn + 1)]
+                             for _ in range(board_size)]
+        self.pieces = [{piece_type: [rng.getrandbits(64) for _ in range(max_pieces + 1)] for piece_type in MacoPieceType}
+                       for _ in range(2)]
+
+    # region Methods
+    def compute_key(self, game_state: Union['MacoGameState', 'MacoObservation']) -> int:
+        """Computes the key of a position from scratch."""
+        key = self.get_turn_key(game_state.current_turn) ^ self.get_action_points_key(game_state.action_points_left)
+        for (x, y), value in game_state.board.items():
+            key ^= self.get_cell_key(x * self.board_size + y, value)
+        for row, duration in game_state.blocked_rows.items():
+            key ^= self.get_blocked_row_key(row, duration)
+        for player, pieces in enumerate([game_state.player_0_pieces, game_state.player_1_pieces]):
+            for piece_type in MacoPieceType:
+                key ^= self.get_pieces_key(player, piece_type, pieces.get_amount(piece_type))
+        return key
+    # endregion
+
+    # region Getters
+    def get_cell_key(self, cell: int, value: Optional[int]) -> int:
+        """Returns the key of the content of the cell with index `x * board_size + y`. Empty cells have no key."""
+        if value is None:
+            return 0
+        return self.cells[cell][value]
+
+    def get_turn_key(self, turn: int) -> int:
+        return self.turn if turn == 1 else 0
+
+    def get_action_points_key(self, action_points: int) -> int:
+        if 0 <= action_points < len(self.action_points):
+            return self.action_points[action_points]
+        return splitmix64(self.action_points[0] ^ action_points)
+
+    def get_blocked_row_key(self, row: int, duration: int) -> int:
+        durations = self.blocked_rows[row]
+        if 0 <= duration < len(durations):
+            return durations[duration]
+        return splitmix64(durations[0] ^ duration)
+
+    def get_pieces_key(self, player: int, piece_type: 'MacoPieceType', amount: int) -> int:
+        amounts = self.pieces[player][piece_type]
+        if 0 <= amount < len(amounts):
+            return amounts[amount]
+        return splitmix64(amounts[0] ^ amount)
+    # endregion
+
+
+@lru_cache(maxsize=None)
+def get_zobrist_table(board_size: int, action_points_per_turn: int, max_pieces: int) -> 'MacoZobristTable':
+    """Returns the table of keys for the given game dimensions, built once per set of dimensions."""
+    return MacoZobristTable(board_size, action_points_per_turn, max_pieces)
@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Hashable, List, Optional
+import random
 from games.action import Action
 from games.game_parameters import GameParameters
 
 class Observation(ABC):
     """Abstract class that will define the observation of the game"""
+    clones = 0
+    """Amount of observations cloned or copied with `clone` and `copy_into`, counted by the implementations."""
 
     @abstractmethod
     def get_game_parameters(self) -> 'GameParameters':
@@ -52,6 +55,16 @@ class Observation(ABC):
         pass
 
     @abstractmethod
-    def get_random_action(self) -> 'Action':
-        """Return a random valid action"""
+    def get_random_action(self, rng: Optional[random.Random] = None) -> 'Action':
+        """Return a random valid action, drawn with `rng` if given"""
         pass
+
+    @abstractmethod
+    def get_key(self) -> Hashable:
+        """Return a hashable key that identifies the observed position"""
+        pass
+
+    def get_turn_key(self, actions: List['Action']) -> Hashable:
+        """Return a hashable key of the turn made of the actions played from this observation. Turns with the same key
+        reach the same position. By default the key is the actions in order"""
+        return tuple(actions)
@@ -3,6 +3,12 @@ from games import Observation
 
 class Heuristic(ABC):
     """Abstract class that will define a heuristic for the game"""
+    def __init__(self):
+        self.calls = 0
+
+    def get_calls(self) -> int:
+        """Returns the number of times the reward was computed, counted by the implementations"""
+        return self.calls
 
     @abstractmethod
     def get_reward(self, observation: 'Observation') -> int:
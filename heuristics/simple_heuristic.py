@@ -6,6 +6,7 @@ class SimpleHeuristic(Heuristic):
 
     def get_reward(self, observation: 'Observation'):
         """Returns a reward for the current player."""
+        self.calls += 1
         if observation.get_current_turn() == 0:
             return observation.get_player_0_score() - observation.get_player_1_score()
         else:
@@ -56,7 +56,11 @@ if __name__ == '__main__':
 
     game.set_save_file(save_name)
 
-    game.run(players[0], players[1], budget, rounds, verbose, enforce_time)
+    try:
+        game.run(players[0], players[1], budget, rounds, verbose, enforce_time)
+    finally:
+        for player in players:
+            player.close()
 
     if verbose:
         print("\n*** ------------------------------------------------- ")
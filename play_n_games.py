@@ -1,6 +1,6 @@
 import math
 import sys
-from typing import List
+from typing import List, Optional
 import scipy.stats as ss
 import time
 import datetime
@@ -12,9 +12,9 @@ from heuristics import *
 from utils import ConfigurationReader, ResultsWriter
 
 
-def get_game(game_name: str) -> 'Game':
+def get_game(game_name: str, parameters_conf: dict = None) -> 'Game':
     """Given the name of the game to be played, create the corresponding game objects."""
-    parameters = get_parameters(game_name)
+    parameters = get_parameters(game_name, parameters_conf)
     forward_model = get_forward_model(game_name)
     return eval(game_name + 'Game')(parameters, forward_model)
 
@@ -47,9 +47,11 @@ def get_heuristic(heuristic_name: str) -> 'Heuristic':
     return eval(heuristic_name + 'Heuristic')()
 
 
-def get_parameters(game: str) -> 'GameParameters':
+def get_parameters(game: str, conf: dict = None) -> 'GameParameters':
     """Given the game name, create the corresponding GameParameters object."""
-    return eval(game + 'GameParameters')()
+    if conf is None:
+        return eval(game + 'GameParameters')()
+    return eval(game + 'GameParameters')(**conf)
 
 
 def get_forward_model(game: str) -> 'ForwardModel':
@@ -58,13 +60,14 @@ def get_forward_model(game: str) -> 'ForwardModel':
 
 
 def run_n_games(gm: 'Game', pl1: 'Player', pl2: 'Player', n_gms: int,
-                budget: int, rounds: int, verbose: bool, enforce_time: bool) -> List[int]:
+                budget: int, rounds: int, verbose: bool, enforce_time: bool,
+                forward_model_budget: Optional[int] = None) -> List[int]:
     """Run n_gms games and return the number of wins for each player and the number of ties."""
     wins1 = 0
     wins2 = 0
     ties = 0
     for _ in tqdm(range(n_gms), desc="Games"):
-        winner = gm.run(pl1, pl2, budget, rounds, verbose, enforce_time)
+        winner = gm.run(pl1, pl2, budget, rounds, verbose, enforce_time, forward_model_budget)
         if winner == 0:
             wins1 += 1
         elif winner == 1:
@@ -74,6 +77,14 @@ def run_n_games(gm: 'Game', pl1: 'Player', pl2: 'Player', n_gms: int,
     return [wins1, wins2, ties]
 
 
+def get_think_statistics_means(player: 'Player') -> dict:
+    """Return the mean of each statistic over all the thinks of the player."""
+    thinks = [statistics.to_dict() for statistics in player.get_think_statistics()]
+    if len(thinks) == 0:
+        return {}
+    return {name: sum(think[name] for think in thinks) / len(thinks) for name in thinks[0]}
+
+
 def stat_test(point1: int, point2: int, n: int) -> float:
     """two-proportion z-test to compare the performance of two bots"""
     # Number of games played
@@ -118,6 +129,7 @@ if __name__ == '__main__':
     conf = ConfigurationReader(sys.argv[1])
 
     game_name = conf.get("game_name")
+    game_parameters = conf.get("game_parameters")
     player1_name = conf.get("player1_name")
     player1_config = conf.get("player1_config")
     player2_name = conf.get("player2_name")
@@ -128,8 +140,9 @@ if __name__ == '__main__':
     enforce_time = conf.get("enforce_time")
     budget = conf.get("budget")
     rounds = conf.get("rounds")
+    forward_model_budget = conf.get("forward_model_budget")
 
-    game = get_game(game_name)
+    game = get_game(game_name, game_parameters)
     heuristic = get_heuristic(heuristic_name)
     player1 = get_player(game_name, player1_name, heuristic, player1_config)
     player2 = get_player(game_name, player2_name, heuristic, player2_config)
@@ -140,20 +153,28 @@ if __name__ == '__main__':
     print("Player2        : {}".format(player2_name))
     print("Number of games: {}".format(n_games))
     print("Budget         : {}".format(budget))
+    if forward_model_budget is not None:
+        print("FM budget      : {}".format(forward_model_budget))
 
     wins1 = 0
     wins2 = 0
     ties = 0
     t0 = time.time()
-    w1, w2, t = run_n_games(game, player1, player2, int(n_games/2), budget, rounds, verbose, enforce_time)
-    wins1 += w1
-    wins2 += w2
-    ties += t
-
-    w1, w2, t = run_n_games(game, player2, player1, int(n_games/2), budget, rounds, verbose, enforce_time)
-    wins2 += w1
-    wins1 += w2
-    ties += t
+    try:
+        w1, w2, t = run_n_games(game, player1, player2, int(n_games/2), budget, rounds, verbose, enforce_time,
+                                forward_model_budget)
+        wins1 += w1
+        wins2 += w2
+        ties += t
+
+        w1, w2, t = run_n_games(game, player2, player1, int(n_games/2), budget, rounds, verbose, enforce_time,
+                                forward_model_budget)
+        wins2 += w1
+        wins1 += w2
+        ties += t
+    finally:
+        player1.close()
+        player2.close()
     tf = time.time() - t0
 
     if wins1 > wins2:
@@ -185,6 +206,7 @@ if __name__ == '__main__':
     result.set("player2_name", player2_name)
     result.set("n_games", n_games)
     result.set("budget", budget)
+    result.set("forward_model_budget", forward_model_budget)
     result.set("wins1", wins1)
     result.set("wins2", wins2)
     result.set("ties", ties)
@@ -192,6 +214,10 @@ if __name__ == '__main__':
     result.set("player_1_visited_states", player1.get_visited_states_count() / n_games)
     result.set("player_2_forward_model_visits", player2.get_forward_model_visits() / n_games)
     result.set("player_2_visited_states", player2.get_visited_states_count() / n_games)
+    result.set("player_1_think_statistics", [statistics.to_dict() for statistics in player1.get_think_statistics()])
+    result.set("player_2_think_statistics", [statistics.to_dict() for statistics in player2.get_think_statistics()])
+    result.set("player_1_think_statistics_means", get_think_statistics_means(player1))
+    result.set("player_2_think_statistics_means", get_think_statistics_means(player2))
     result.set("p_value", p_value)
     result.set("processing_time", tf)
     result.set("date", datetime.datetime.now().strftime("%Y-%m-%d"))
@@ -1,7 +1,10 @@
-__all__ = ('Player', 'GeneticPlayer', 'HumanPlayer', 'RandomPlayer', 'AlwaysFirstPlayer', 'GreedyActionPlayer', 'GreedyTurnPlayer', \
+__all__ = ('Player', 'Deadline', 'ThinkStatistics', 'FitnessCache', 'GeneticPlayer', 'HumanPlayer', 'RandomPlayer', 'AlwaysFirstPlayer', 'GreedyActionPlayer', 'GreedyTurnPlayer', \
            'MontecarloTreeSearchPlayer', 'OnlineEvolutionPlayer', \
             'BridgeBurningMontecarloTreeSearchPlayer', 'NonExploringMontecarloTreeSearchPlayer')
 
+from .deadline import Deadline
+from .think_statistics import ThinkStatistics
+from .fitness_cache import FitnessCache
 from .player import Player
 from .human_player import HumanPlayer
 from .random_player import RandomPlayer
@@ -1,8 +1,7 @@
 from games import Action, Observation, ForwardModel
 from heuristics import Heuristic
-from players.montecarlo_tree_search.montecarlo_tree_search_node import MontecarloTreeSearchNode
+from players.montecarlo_tree_search.montecarlo_tree_search_tree import MontecarloTreeSearchTree
 from players.player import Player
-import time
 
 class BridgeBurningMontecarloTreeSearchPlayer(Player):
     def __init__(self, heuristic: 'Heuristic', c_value: float):
@@ -17,38 +16,45 @@ class BridgeBurningMontecarloTreeSearchPlayer(Player):
         self.turn.clear()
 
         # compute the turn
-        root = MontecarloTreeSearchNode(observation, self.heuristic, None)
-        self.forward_model_visits += root.extend(forward_model, self.visited_states)
-        current_node = root
-
-        budget_round = budget / observation.get_game_parameters().get_action_points_per_turn()
-        for _ in range(observation.get_game_parameters().get_action_points_per_turn()):
-            t0 = time.time()
-            while time.time() - t0 < budget_round - 0.05:
-                best_child = current_node.get_best_child_by_ucb(self.c_value)
-                if best_child is None:
+        tree = MontecarloTreeSearchTree(observation, self.heuristic)
+        self.forward_model_visits += tree.extend(forward_model, self.visited_states, lazy=True)
+        root = tree.ROOT
+
+        action_points_per_turn = observation.get_game_parameters().get_action_points_per_turn()
+        budget_round = budget / action_points_per_turn
+        for _ in range(action_points_per_turn):
+            self.start_budget(budget_round)
+            while self.get_is_budget_left(1 / action_points_per_turn):
+                # select down to a node without children
+                best_child = tree.get_best_child_by_ucb(tree.get_current(), self.c_value)
+                if best_child == tree.NO_NODE:
                     break
-                if best_child.get_amount_of_children() > 0:
-                    current_node = best_child
-                else:
-                    if not best_child.get_is_unvisited() and not best_child.get_is_terminal(forward_model):
-                        self.forward_model_visits += best_child.extend(forward_model, self.visited_states)
-                        best_child = best_child.get_random_child()
-                    reward, fm_visits = best_child.full_rollout(forward_model, self.visited_states)
-                    self.forward_model_visits += fm_visits
-                    best_child.backpropagate(reward)
-                    current_node = root
+                self.forward_model_visits += tree.move_to_child(best_child, forward_model, self.visited_states)
+                while tree.get_amount_of_children(best_child) > 0:
+                    best_child = tree.get_best_child_by_ucb(best_child, self.c_value)
+                    self.forward_model_visits += tree.move_to_child(best_child, forward_model, self.visited_states)
+
+                if not tree.get_is_unvisited(best_child) and not tree.get_is_terminal(forward_model):
+                    self.forward_model_visits += tree.extend(forward_model, self.visited_states, lazy=True)
+                    if tree.get_amount_of_children(best_child) > 0:
+                        best_child = tree.get_random_child(best_child)
+                        self.forward_model_visits += tree.move_to_child(best_child, forward_model, self.visited_states)
+                reward, fm_visits = tree.full_rollout(forward_model, self.visited_states)
+                self.forward_model_visits += fm_visits
+                tree.backpropagate(best_child, reward)
+                tree.move_to(root, forward_model)
 
             # retrieve the turn
-            current_node = root
-            best_child = current_node.get_best_child_by_average()
-            if best_child is None:
+            best_child = tree.get_best_child_by_average(root)
+            if best_child == tree.NO_NODE:
                 break
-            self.turn.append(best_child.get_action())
+            self.turn.append(tree.get_action(best_child))
             root = best_child
-            if root.get_amount_of_children() == 0:
-                root.extend(forward_model, self.visited_states)
-            current_node = best_child
+            tree.move_to(root, forward_model)
+            if tree.get_amount_of_children(root) == 0:
+                tree.extend(forward_model, self.visited_states, lazy=True)
+        self.statistics.nodes += tree.get_size()
+        self.statistics.max_depth = max(self.statistics.max_depth, tree.get_max_depth())
 
     def get_action(self, index: int) -> 'Action':
         """Returns the next action in the turn."""
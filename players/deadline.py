@@ -0,0 +1,67 @@
+from typing import Callable
+import time
+
+
+class Deadline:
+    """
+    Time budget of a search loop, measured with `clock`, which is `time.perf_counter` unless a test replaces it.
+
+    `get_is_time_left` is called once per iteration, before the iteration runs. It measures the cost of the iterations
+    from the time between clock reads and answers whether another iteration fits before the deadline, leaving
+    `reserve` seconds for the work after the loop. The cost is a decaying maximum of the measured costs, so a spike
+    such as a garbage collection is kept for a few clock reads but doesn't stop the loop for the rest of the budget. The
+    clock is read on every iteration until `SAMPLE_ITERATIONS` iterations were measured. After that, the next read is
+    scheduled after as many iterations as fit in a fraction of the remaining time at that cost.
+    """
+    SAFETY_ITERATIONS = 2
+    SAMPLE_ITERATIONS = 3
+    REMAINING_FRACTION = 0.25
+    MAX_UNCHECKED_ITERATIONS = 64
+    DECAY = 0.5
+
+    def __init__(self, budget: float, reserve: float = 0.02, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.end = clock() + budget - reserve
+        self.last_check = 0.0
+        self.iterations = 0
+        self.last_check_iterations = 0
+        self.next_check_iterations = 1
+        self.samples = 0
+        self.iteration_cost = 0.0
+
+    # region Getters
+    def get_is_time_left(self) -> bool:
+        """Counts an iteration and returns whether there is time for another one."""
+        self.iterations += 1
+        if self.iterations < self.next_check_iterations:
+            return True
+
+        # The first call comes before any iteration, so the time before it is not an iteration cost
+        now = self.clock()
+        if self.iterations > 1:
+            cost = (now - self.last_check) / (self.iterations - self.last_check_iterations)
+            self.iteration_cost = max(cost, self.iteration_cost * self.DECAY)
+            self.samples += 1
+        self.last_check = now
+        self.last_check_iterations = self.iterations
+
+        time_left = self.end - now
+        if time_left <= 0 or time_left < self.iteration_cost * self.SAFETY_ITERATIONS:
+            return False
+        unchecked_iterations = 0
+        if self.samples >= self.SAMPLE_ITERATIONS:
+            unchecked_iterations = self.MAX_UNCHECKED_ITERATIONS
+            if self.iteration_cost > 0:
+                unchecked_iterations = min(unchecked_iterations,
+                                           int(time_left * self.REMAINING_FRACTION / self.iteration_cost))
+        self.next_check_iterations = self.iterations + 1 + unchecked_iterations
+        return True
+
+    def get_time_left(self) -> float:
+        """Returns the seconds left until the deadline."""
+        return self.end - self.clock()
+
+    def get_iteration_cost(self) -> float:
+        """Returns the decaying maximum of the measured seconds per iteration."""
+        return self.iteration_cost
+    # endregion
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from typing import Hashable, List, Optional
+from games import Action, Observation
+
+
+class FitnessCache:
+    """Bounded cache of the fitness of the turns of a think, keyed by `Observation.get_turn_key` of the observation the
+    turns are played from, so the turns that reach the same position share their fitness. Turns whose fitness depends on
+    the order of their actions even when their key doesn't, such as turns that end the game before their last action,
+    are put with `exact` and keyed by their actions in order. The least recently used turns are evicted first."""
+    def __init__(self, observation: 'Observation', capacity: int = 100000):
+        self.observation = observation
+        self.capacity = capacity
+        self.entries: 'OrderedDict[Hashable, float]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # region Methods
+    def get(self, actions: List['Action']) -> Optional[float]:
+        """Returns the fitness of the turn, or None if it is not cached."""
+        key = self.observation.get_turn_key(actions)
+        fitness = self.entries.get(key)
+        if fitness is None:
+            key = tuple(actions)
+            fitness = self.entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return fitness
+
+    def put(self, actions: List['Action'], fitness: float, exact: bool = False) -> None:
+        """Caches the fitness of the turn, evicting the least recently used one if it is full. With `exact`, the turn is
+        keyed by its actions in order instead of its turn key."""
+        key = tuple(actions) if exact else self.observation.get_turn_key(actions)
+        self.entries[key] = fitness
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+    # endregion
+
+    # region Getters
+    def get_hits(self) -> int:
+        return self.hits
+
+    def get_misses(self) -> int:
+        return self.misses
+
+    def get_hit_rate(self) -> float:
+        """Returns the fraction of lookups that were hits, or 0 if there were none."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def get_size(self) -> int:
+        return len(self.entries)
+    # endregion
+
+    # region Override
+    def __len__(self) -> int:
+        return len(self.entries)
+    # endregion
@@ -1,9 +1,10 @@
 import random
 import numpy as np
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from games import Action, Observation, ForwardModel
 from heuristics import Heuristic
 from collections import defaultdict
+from players.fitness_cache import FitnessCache
 
 
 
@@ -17,47 +18,81 @@ class GeneticAlgorithm:
         # self.visited_states = defaultdict(int)
 
     def generate_random_individual(self, observation: 'Observation', forward_model: 'ForwardModel') -> List['Action']:
-        """Generates a random individual (a list of actions) based on the available actions."""
+        """Generates a random individual (a list of actions) based on the available actions. The observation is stepped
+        and restored with undo records instead of cloned."""
         individual = []
-        current_observation = observation.clone()
+        undos = []
         for _ in range(observation.get_game_parameters().get_action_points_per_turn()):
-            actions = current_observation.get_actions()
+            actions = observation.get_actions()
             if actions:
                 action = random.choice(actions)
                 individual.append(action)
-                forward_model.step(current_observation, action)
+                undos.append(forward_model.step_with_undo(observation, action))
                 self.forward_model_visits += 1
                 # self.visited_states[current_observation] += 1
             else:
                 break
+        for undo in reversed(undos):
+            forward_model.unstep(observation, undo)
         return individual
 
-    def evaluate_individual(self, individual: List['Action'], observation: 'Observation',
-                            forward_model: 'ForwardModel') -> float:
-        """Evaluates the fitness of an individual by simulating the game with the individual's actions and the opponent's possible responses."""
-        total_reward = 0
-        num_simulations = 2
-
-        for _ in range(num_simulations):
-            new_observation = observation.clone()
-            for action in individual:
-                if forward_model.is_terminal(new_observation) or forward_model.is_turn_finished(new_observation):
-                    break
-                forward_model.step(new_observation, action)
-                self.forward_model_visits += 1
-                # self.visited_states[new_observation] += 1
-
-            # Simulate the opponent's turn
-            while not forward_model.is_turn_finished(new_observation):
-                opponent_action = new_observation.get_random_action()
-                forward_model.step(new_observation, opponent_action)
-                self.forward_model_visits += 1
-                # self.visited_states[new_observation] += 1
+    def evaluate_population(self, population: List[List['Action']], observation: 'Observation',
+                            forward_model: 'ForwardModel',
+                            fitness_cache: Optional['FitnessCache'] = None) -> List[float]:
+        """Evaluates the fitness of every individual of the population. Individuals that reach the same position, such
+        as elites and duplicates, are simulated once: through the fitness cache if it is given, or else through a cache
+        of this population."""
+        if fitness_cache is None:
+            fitness_cache = FitnessCache(observation)
+        return [self.evaluate_individual(individual, observation, forward_model, fitness_cache)
+                for individual in population]
 
-            reward = self.heuristic.get_reward(new_observation)
-            total_reward += reward
-
-        return total_reward / num_simulations
+    def evaluate_individual(self, individual: List['Action'], observation: 'Observation',
+                            forward_model: 'ForwardModel', fitness_cache: Optional['FitnessCache'] = None) -> float:
+        """Evaluates the fitness of an individual by simulating the game with the individual's actions and the opponent's possible responses.
+        If a fitness cache of the observation is given, the fitness of turns that reach an evaluated position is reused
+        without simulating them. The observation is stepped and restored with undo records instead of cloned, and the
+        own actions are simulated once for all the samples of the responses."""
+        if fitness_cache is not None:
+            fitness = fitness_cache.get(individual)
+            if fitness is not None:
+                return fitness
+
+        undos = []
+        for action in individual:
+            if forward_model.is_terminal(observation) or forward_model.is_turn_finished(observation):
+                break
+            undos.append(forward_model.step_with_undo(observation, action))
+            self.forward_model_visits += 1
+            # self.visited_states[new_observation] += 1
+
+        if forward_model.is_turn_finished(observation):
+            # Nothing is left to sample, so every simulation would give the same reward
+            fitness = self.heuristic.get_reward(observation)
+        else:
+            total_reward = 0
+            num_simulations = 2
+            for _ in range(num_simulations):
+                # Simulate the opponent's turn
+                opponent_undos = []
+                while not forward_model.is_turn_finished(observation):
+                    opponent_action = observation.get_random_action()
+                    opponent_undos.append(forward_model.step_with_undo(observation, opponent_action))
+                    self.forward_model_visits += 1
+                    # self.visited_states[new_observation] += 1
+
+                total_reward += self.heuristic.get_reward(observation)
+                for undo in reversed(opponent_undos):
+                    forward_model.unstep(observation, undo)
+            fitness = total_reward / num_simulations
+
+        # The simulation stops when the game ends, so another order of the actions may end it elsewhere
+        terminal = forward_model.is_terminal(observation)
+        for undo in reversed(undos):
+            forward_model.unstep(observation, undo)
+        if fitness_cache is not None:
+            fitness_cache.put(individual, fitness, exact=terminal)
+        return fitness
 
     def select_parents(self, population: List[List['Action']], fitness_scores: List[float]) -> List[List['Action']]:
         """Selects parents for reproduction based on their fitness scores."""
@@ -99,23 +134,23 @@ class GeneticAlgorithm:
 
     def mutate(self, individual: List['Action'], observation: 'Observation', forward_model: 'ForwardModel') -> List[
         'Action']:
-        """Performs mutation on an individual."""
-        mutated_individual = []
-        current_observation = observation.clone()
-        for action in individual:
-            if random.random() < self.mutation_rate:
-                actions = current_observation.get_actions()
+        """Performs mutation on an individual. The mutated indices are drawn first, so only the actions before the last
+        one are simulated, and the observation is stepped and restored with undo records instead of cloned."""
+        mutated_individual = list(individual)
+        mutated_indices = [i for i in range(len(individual)) if random.random() < self.mutation_rate]
+        if not mutated_indices:
+            return mutated_individual
+
+        undos = []
+        for i in range(mutated_indices[-1] + 1):
+            if i in mutated_indices:
+                actions = observation.get_actions()
                 if actions:
-                    mutated_action = random.choice(actions)
-                    mutated_individual.append(mutated_action)
-                    forward_model.step(current_observation, mutated_action)
-
-                else:
-                    mutated_individual.append(action)
-                    forward_model.step(current_observation, action)
-            else:
-                mutated_individual.append(action)
-                forward_model.step(current_observation, action)
-            self.forward_model_visits += 1
-            # self.visited_states[current_observation] += 1
-        return mutated_individual
\ No newline at end of file
+                    mutated_individual[i] = random.choice(actions)
+            if i < mutated_indices[-1]:
+                undos.append(forward_model.step_with_undo(observation, mutated_individual[i]))
+                self.forward_model_visits += 1
+                # self.visited_states[current_observation] += 1
+        for undo in reversed(undos):
+            forward_model.unstep(observation, undo)
+        return mutated_individual
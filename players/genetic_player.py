@@ -3,18 +3,25 @@ from heuristics import Heuristic
 from players.player import Player
 import random
 import numpy as np
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from players.genetic import GeneticAlgorithm
+from players.fitness_cache import FitnessCache
 
 
 class GeneticPlayer(Player):
-    def __init__(self, heuristic: 'Heuristic', population_size: int, mutation_rate: float, elite_rate: float, generations: int = 100):
+    def __init__(self, heuristic: 'Heuristic', population_size: int, mutation_rate: float, elite_rate: float, generations: Optional[int] = None,
+                 fitness_cache_size: int = 100000):
+        """Entity that plays a game by evolving turns with a genetic algorithm until the budget is spent, or for at most
+        `generations` generations if it is given. The fitness of the turns is cached during each think, up to
+        `fitness_cache_size` entries."""
         super().__init__()
         self.heuristic = heuristic
         self.population_size = population_size
         self.mutation_rate = mutation_rate
         self.elite_rate = elite_rate
         self.generations = generations
+        self.fitness_cache_size = fitness_cache_size
+        self.fitness_cache: Optional['FitnessCache'] = None
         self.population = []
         self.turn = []
         self.genetic_algorithm = GeneticAlgorithm(self.heuristic, self.population_size, self.mutation_rate, self.elite_rate, self.forward_model_visits, self.visited_states)
@@ -25,13 +32,33 @@ class GeneticPlayer(Player):
     def think(self, observation: 'Observation', forward_model: 'ForwardModel', budget: float) -> None:
         """Computes a list of actions for a complete turn using a genetic algorithm and returns them in order each time it's called during the turn."""
         self.turn.clear()
+        self.start_budget(budget)
+        # The genetic algorithm steps and restores this copy of the observation
+        observation = observation.clone()
+        self.fitness_cache = FitnessCache(observation, self.fitness_cache_size)
 
         # Initialize population
         self.population = [self.genetic_algorithm.generate_random_individual(observation, forward_model) for _ in range(self.population_size)]
 
-        for generation in range(self.generations):
-            # Evaluate fitness of each individual
-            fitness_scores = [self.genetic_algorithm.evaluate_individual(individual, observation, forward_model) for individual in self.population]
+        best_individual = self.population[0]
+        best_fitness = -np.inf
+        generation = 0
+        while self.generations is None or generation < self.generations:
+            # Stop when the budget is spent
+            self.forward_model_visits = self.genetic_algorithm.forward_model_visits
+            if not self.get_is_budget_left():
+                break
+            generation += 1
+
+            # Evaluate fitness of each individual and keep the best one so far
+            hits = self.fitness_cache.get_hits()
+            fitness_scores = self.genetic_algorithm.evaluate_population(self.population, observation, forward_model, self.fitness_cache)
+            # cached individuals still spend the forward model budget
+            self.charge_budget(self.fitness_cache.get_hits() - hits)
+            best_index = int(np.argmax(fitness_scores))
+            if fitness_scores[best_index] > best_fitness:
+                best_individual = self.population[best_index]
+                best_fitness = fitness_scores[best_index]
 
             # Select parents for reproduction
             parents = self.genetic_algorithm.select_parents(self.population, fitness_scores)
@@ -44,12 +71,13 @@ class GeneticPlayer(Player):
             elite_individuals = [self.population[i] for i in np.argsort(fitness_scores)[-elite_count:]]
             self.population = elite_individuals + offspring[:self.population_size - elite_count]
 
-        # Select the best individual as the action sequence for the turn
-        best_individual = max(self.population, key=lambda individual: self.genetic_algorithm.evaluate_individual(individual, observation, forward_model))
+        # Use the best individual found as the action sequence for the turn
         self.turn = best_individual
 
         # Update forward_model_visits and visited_states from the GeneticAlgorithm instance
         self.forward_model_visits = self.genetic_algorithm.forward_model_visits
+        self.statistics.cache_hits += self.fitness_cache.get_hits()
+        self.statistics.cache_misses += self.fitness_cache.get_misses()
         # self.visited_states = self.genetic_algorithm.visited_states
 
     def get_action(self, index: int) -> 'Action':
@@ -1,3 +0,0 @@
-__all__ = ('GreedyTurnNode')
-
-from .greedy_turn_node import GreedyTurnNode
\ No newline at end of file
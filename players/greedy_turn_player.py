@@ -2,9 +2,7 @@ from typing import List
 from games import Action, Observation, ForwardModel
 from heuristics import Heuristic
 from players import Player
-from players.greedy_turn import GreedyTurnNode
 import math
-import time
 
 # Ali
 class GreedyTurnPlayer(Player):
@@ -17,32 +15,35 @@ class GreedyTurnPlayer(Player):
     def think(self, observation: Observation, forward_model: ForwardModel, budget: float) -> None:
         self.turn.clear()
         self.best_reward = -math.inf
-        start_time = time.time()
-        root = GreedyTurnNode(observation, self.heuristic)
-        self._run_search(root, forward_model, budget, start_time)
+        self.start_budget(budget)
+        self._run_search(observation.clone(), [], forward_model)
 
     def get_action(self, index: int) -> Action:
         if 0 <= index < len(self.turn):
             return self.turn[index]
         return None
 
-    def _run_search(self, node: GreedyTurnNode, forward_model: ForwardModel, budget: float, start_time: float) -> None:
-        if node.parent is not None:
-            self.visited_states[node.get_observation()] += 1
+    def _run_search(self, observation: Observation, path: List[Action], forward_model: ForwardModel) -> None:
+        """Searches every turn depth-first, stepping and reverting a single observation."""
+        if path:
+            self.visited_states[observation.get_key()] += 1
             self.forward_model_visits += 1
 
-        if time.time() - start_time > budget:
-            return
-
-        if forward_model.is_turn_finished(node.get_observation()):
-            reward = self.heuristic.get_reward(node.get_observation())
+        if forward_model.is_turn_finished(observation):
+            reward = self.heuristic.get_reward(observation)
             if reward > self.best_reward:
                 self.best_reward = reward
-                self.turn = node.get_path()
+                self.turn = path.copy()
             return
 
-        for child in node.extend(forward_model):
-            self._run_search(child, forward_model, budget, start_time)
+        for action in observation.get_actions():
+            if not self.get_is_budget_left():
+                return
+            undo = forward_model.step_with_undo(observation, action)
+            path.append(action)
+            self._run_search(observation, path, forward_model)
+            path.pop()
+            forward_model.unstep(observation, undo)
 
     def __str__(self) -> str:
         return "GreedyTurnPlayer"
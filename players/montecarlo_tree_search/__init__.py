@@ -1,3 +1,4 @@
-__all__ = ('MontecarloTreeSearchNode')
+__all__ = ('MontecarloTreeSearchTree', 'GreedyPolicyCache')
 
-from .montecarlo_tree_search_node import MontecarloTreeSearchNode
\ No newline at end of file
+from .montecarlo_tree_search_tree import MontecarloTreeSearchTree
+from .greedy_policy_cache import GreedyPolicyCache
\ No newline at end of file
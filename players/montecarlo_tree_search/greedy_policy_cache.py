@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+from games import Action
+
+
+class GreedyPolicyCache:
+    """Bounded cache of the greedy best action of positions, the reward it leads to and the amount of actions that were
+    evaluated to find it, keyed by the keys of their observations. The least recently used positions are evicted
+    first."""
+    def __init__(self, capacity: int = 100000):
+        self.capacity = capacity
+        self.entries: 'OrderedDict[Any, Tuple[Action, float, int]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # region Methods
+    def get(self, key: Any) -> Optional[Tuple['Action', float, int]]:
+        """Returns the best action, reward and evaluated actions of the position, or None if it is not cached."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Any, action: 'Action', reward: float, evaluated_actions: int) -> None:
+        """Caches the best action, reward and evaluated actions of the position, evicting the least recently used one if
+        it is full."""
+        self.entries[key] = (action, reward, evaluated_actions)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+    # endregion
+
+    # region Getters
+    def get_hits(self) -> int:
+        return self.hits
+
+    def get_misses(self) -> int:
+        return self.misses
+
+    def get_hit_rate(self) -> float:
+        """Returns the fraction of lookups that were hits, or 0 if there were none."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def get_size(self) -> int:
+        return len(self.entries)
+    # endregion
+
+    # region Override
+    def __len__(self) -> int:
+        return len(self.entries)
+    # endregion
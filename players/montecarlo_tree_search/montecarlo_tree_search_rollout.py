@@ -0,0 +1,121 @@
+from collections import defaultdict
+from typing import Optional, Tuple
+from games import Action, Observation, ForwardModel
+from heuristics import Heuristic
+from players.montecarlo_tree_search.greedy_policy_cache import GreedyPolicyCache
+import math
+
+
+def rollout(observation: 'Observation', heuristic: 'Heuristic', forward_model: 'ForwardModel',
+            visited: defaultdict) -> Tuple[float, int]:
+    """Performs a random rollout until the end of the turn from a copy of the observation and returns the reward."""
+    new_observation = observation.clone()
+    fm_visits = 0
+    while not forward_model.is_terminal(new_observation) \
+            and not forward_model.is_turn_finished(new_observation):
+        forward_model.step(new_observation, new_observation.get_random_action())
+        visited[new_observation.get_key()] += 1
+        fm_visits += 1
+
+    return heuristic.get_reward(new_observation), fm_visits
+
+
+def full_rollout(observation: 'Observation', heuristic: 'Heuristic', forward_model: 'ForwardModel',
+                 visited: defaultdict) -> Tuple[float, int]:
+    """Performs a random rollout from a copy of the observation that continues into the opponent turn for as many
+    actions as were left in the current one, and returns the reward."""
+    new_observation = observation.clone()
+    fm_visits = 0
+    while not forward_model.is_terminal(new_observation) \
+            and not forward_model.is_turn_finished(new_observation):
+        forward_model.step(new_observation, new_observation.get_random_action())
+        visited[new_observation.get_key()] += 1
+        fm_visits += 1
+    reward = heuristic.get_reward(new_observation)
+
+    turn_changed = False
+    forward_model.on_turn_ended(new_observation)
+    for _ in range(fm_visits, observation.get_game_parameters().get_action_points_per_turn() - 1):
+        if forward_model.is_terminal(new_observation):
+            break
+        forward_model.step(new_observation, new_observation.get_random_action())
+        visited[new_observation.get_key()] += 1
+        fm_visits += 1
+        turn_changed = True
+
+    if turn_changed:
+        reward -= heuristic.get_reward(new_observation)
+
+    return reward, fm_visits
+
+
+def get_best_action(observation: 'Observation', heuristic: 'Heuristic', forward_model: 'ForwardModel',
+                    visited: defaultdict, cache: Optional['GreedyPolicyCache'] = None) -> Tuple['Action', int]:
+    """Returns the action with the best immediate reward, stepping and reverting the observation for each one. If a
+    cache is given, the action of positions found in it is returned without stepping anything."""
+    best_action, fm_visits, _ = evaluate_best_action(observation, heuristic, forward_model, visited, cache)
+    return best_action, fm_visits
+
+
+def evaluate_best_action(observation: 'Observation', heuristic: 'Heuristic', forward_model: 'ForwardModel',
+                         visited: defaultdict, cache: Optional['GreedyPolicyCache'] = None) \
+        -> Tuple['Action', int, int]:
+    """Like `get_best_action`, but also returns the amount of actions evaluated to find the best one, which is the same
+    whether it was cached or not."""
+    if cache is not None:
+        entry = cache.get(observation.get_key())
+        if entry is not None:
+            return entry[0], 0, entry[2]
+
+    best_action = None
+    best_reward = -math.inf
+    fm_visits = 0
+    for roll_action in observation.get_actions():
+        undo = forward_model.step_with_undo(observation, roll_action)
+        visited[observation.get_key()] += 1
+        fm_visits += 1
+        reward = heuristic.get_reward(observation)
+        forward_model.unstep(observation, undo)
+        if reward > best_reward:
+            best_reward = reward
+            best_action = roll_action
+
+    if cache is not None:
+        cache.put(observation.get_key(), best_action, best_reward, fm_visits)
+    return best_action, fm_visits, fm_visits
+
+
+def deterministic_rollout(observation: 'Observation', heuristic: 'Heuristic', forward_model: 'ForwardModel',
+                          visited: defaultdict, cache: Optional['GreedyPolicyCache'] = None) -> Tuple[float, int]:
+    """Performs a greedy rollout from a copy of the observation, like `full_rollout` but choosing every action with
+    `get_best_action`, and returns the reward. The opponent turn is played for as many actions as the evaluated
+    actions fall short of the turn, so the rollout doesn't depend on the cache."""
+    new_observation = observation.clone()
+    fm_visits = 0
+    evaluated_actions = 0
+    while not forward_model.is_terminal(new_observation) \
+            and not forward_model.is_turn_finished(new_observation):
+        best_action, fvisits, evaluated = evaluate_best_action(new_observation, heuristic, forward_model, visited,
+                                                               cache)
+        forward_model.step(new_observation, best_action)
+        visited[new_observation.get_key()] += 1
+        fm_visits += fvisits
+        evaluated_actions += evaluated
+    reward = heuristic.get_reward(new_observation)
+
+    turn_changed = False
+    forward_model.on_turn_ended(new_observation)
+    for _ in range(evaluated_actions, observation.get_game_parameters().get_action_points_per_turn() - 1):
+        if forward_model.is_terminal(new_observation):
+            break
+        best_action, fvisits, evaluated = evaluate_best_action(new_observation, heuristic, forward_model, visited,
+                                                               cache)
+        forward_model.step(new_observation, best_action)
+        visited[new_observation.get_key()] += 1
+        fm_visits += fvisits
+        turn_changed = True
+
+    if turn_changed:
+        reward -= heuristic.get_reward(new_observation)
+
+    return reward, fm_visits
@@ -0,0 +1,271 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from games import Action, Observation, ForwardModel
+from heuristics import Heuristic
+from players.montecarlo_tree_search.greedy_policy_cache import GreedyPolicyCache
+from players.montecarlo_tree_search.montecarlo_tree_search_rollout import (rollout, full_rollout,
+                                                                           deterministic_rollout)
+import random
+import sys
+import numpy as np
+
+NO_NODE = -1
+"""Index returned instead of a node when there is none."""
+
+
+class MontecarloTreeSearchTree:
+    """
+    Tree used in Montecarlo Tree Search, stored as arrays indexed by node instead of one object per node.
+
+    Each node has a parent, the action that leads to it, a depth, visits and a reward sum. The children of a node are
+    added together by `extend`, so they take a contiguous range of indices given by `first_child` and `child_count`.
+    The arrays are preallocated and doubled when they are full.
+
+    Nodes don't keep observations. The tree has a single working observation, the cursor, which is moved between nodes
+    by stepping the actions from the root and reverting them with `ForwardModel.unstep`. Rollouts, extensions and
+    terminal checks act on the node the cursor is at. Replaying the actions of nodes whose states were already visited
+    is not counted as forward model visits.
+
+    Children added by a lazy `extend` only record their action. Their state is built the first time the cursor moves to
+    them, which `move_to_child` counts as a forward model visit.
+
+    With `transpositions` set, nodes whose states have the same key (such as the same pieces placed in a different
+    order) share a position: the first node that reaches a key holds the visits, reward and children of every node that
+    reaches it later, so the tree becomes a graph. `position` maps each node to the node holding its position. As a
+    position can be reached from several parents, `backpropagate` follows the path of the cursor instead of the parents.
+    """
+    ROOT = 0
+    NO_NODE = NO_NODE
+
+    def __init__(self, observation: 'Observation', heuristic: 'Heuristic', capacity: int = 1024,
+                 transpositions: bool = False):
+        self.heuristic = heuristic
+        self.observation = observation.clone()
+        self.actions: List['Action'] = [None]
+        self.parent = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.first_child = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.child_count = np.zeros(capacity, dtype=np.int32)
+        self.depth = np.zeros(capacity, dtype=np.int32)
+        self.visits = np.zeros(capacity, dtype=np.int64)
+        self.reward = np.zeros(capacity, dtype=np.float64)
+        self.materialized = np.zeros(capacity, dtype=bool)
+        self.materialized[self.ROOT] = True
+        self.position = np.arange(capacity, dtype=np.int32)
+        self.transpositions: Optional[Dict[int, int]] = None
+        if transpositions:
+            self.transpositions = {self.observation.get_key(): self.ROOT}
+        self.size = 1
+        self.current = self.ROOT
+        self.path = [self.ROOT]
+        self.undos: List[Any] = []
+
+    # region Methods
+    def add_children(self, node: int, actions: List['Action']) -> int:
+        """Adds a child to `node` for each action and returns the index of the first one."""
+        first = self.size
+        self.reserve(first + len(actions))
+        last = first + len(actions)
+        self.actions.extend(actions)
+        self.parent[first:last] = node
+        self.position[first:last] = np.arange(first, last)
+        self.depth[first:last] = self.depth[node] + 1
+        self.first_child[node] = first
+        self.child_count[node] = len(actions)
+        self.size = last
+        return first
+
+    def reserve(self, size: int) -> None:
+        """Makes room for at least `size` nodes."""
+        capacity = len(self.parent)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        self.parent = self.grow(self.parent, capacity, NO_NODE)
+        self.first_child = self.grow(self.first_child, capacity, NO_NODE)
+        self.child_count = self.grow(self.child_count, capacity, 0)
+        self.depth = self.grow(self.depth, capacity, 0)
+        self.visits = self.grow(self.visits, capacity, 0)
+        self.reward = self.grow(self.reward, capacity, 0)
+        self.materialized = self.grow(self.materialized, capacity, False)
+        self.position = self.grow(self.position, capacity, NO_NODE)
+
+    def grow(self, array: np.ndarray, capacity: int, fill: Any) -> np.ndarray:
+        new_array = np.full(capacity, fill, dtype=array.dtype)
+        new_array[:len(array)] = array
+        return new_array
+
+    def extend(self, forward_model: 'ForwardModel', visited: defaultdict, reward_children: bool = False,
+               lazy: bool = False) -> int:
+        """Extends the node at the cursor with a child for each possible action, stepping each one to record the visited
+        states, and returns the forward model visits. If `reward_children` is set, each child is also given the
+        heuristic reward of its state. If `lazy` is set, the children are only added and nothing is stepped. If the
+        position of the node already has children, they are shared and nothing is added."""
+        node = self.position[self.current]
+        if self.child_count[node] > 0:
+            return 0
+        actions = self.observation.get_actions()
+        first = self.add_children(node, actions)
+        if lazy and not reward_children:
+            return 0
+        self.materialized[first:first + len(actions)] = True
+        for index, action in enumerate(actions):
+            undo = forward_model.step_with_undo(self.observation, action)
+            visited[self.observation.get_key()] += 1
+            if self.add_transposition(first + index) and reward_children:
+                self.reward[first + index] += self.heuristic.get_reward(self.observation)
+            forward_model.unstep(self.observation, undo)
+        return len(actions)
+
+    def move_to_child(self, child: int, forward_model: 'ForwardModel', visited: defaultdict = None) -> int:
+        """Moves the cursor from its node to one of its children. Returns 1 if the state of the child is built for the
+        first time, recording it in `visited`, and 0 otherwise."""
+        self.undos.append(forward_model.step_with_undo(self.observation, self.actions[child]))
+        self.path.append(child)
+        self.current = child
+        if self.materialized[child]:
+            return 0
+        self.materialized[child] = True
+        self.add_transposition(child)
+        if visited is not None:
+            visited[self.observation.get_key()] += 1
+        return 1
+
+    def add_transposition(self, node: int) -> bool:
+        """Looks up the state of the cursor, which is the state of `node`, in the transposition table. Returns whether
+        it is a new position, or else makes `node` share the position that was found."""
+        if self.transpositions is None:
+            return True
+        position = self.transpositions.setdefault(self.observation.get_key(), node)
+        self.position[node] = position
+        return position == node
+
+    def move_to_root(self, forward_model: 'ForwardModel') -> None:
+        """Moves the cursor back to the root, reverting every step on the way."""
+        while self.undos:
+            forward_model.unstep(self.observation, self.undos.pop())
+        del self.path[1:]
+        self.current = self.ROOT
+
+    def move_to(self, node: int, forward_model: 'ForwardModel') -> None:
+        """Moves the cursor to any node, going through the root."""
+        self.move_to_root(forward_model)
+        for child in reversed(self.get_path(node)):
+            self.move_to_child(child, forward_model)
+
+    def rollout(self, forward_model: 'ForwardModel', visited: defaultdict) -> Tuple[float, int]:
+        """Performs a random rollout from the node at the cursor and returns the reward."""
+        return rollout(self.observation, self.heuristic, forward_model, visited)
+
+    def full_rollout(self, forward_model: 'ForwardModel', visited: defaultdict) -> Tuple[float, int]:
+        """Performs a random rollout into the opponent turn from the node at the cursor and returns the reward."""
+        return full_rollout(self.observation, self.heuristic, forward_model, visited)
+
+    def deterministic_rollout(self, forward_model: 'ForwardModel', visited: defaultdict,
+                              cache: Optional['GreedyPolicyCache'] = None) -> Tuple[float, int]:
+        """Performs a greedy rollout from the node at the cursor, looking up the greedy actions in the cache if it is
+        given, and returns the reward."""
+        return deterministic_rollout(self.observation, self.heuristic, forward_model, visited, cache)
+
+    def backpropagate(self, node: int, reward: float) -> None:
+        """Backpropagates the reward to the node and its parents. With transpositions, the reward goes to the positions
+        on the path of the cursor, which must be at `node`."""
+        if self.transpositions is not None:
+            positions = self.position[self.path]
+            self.visits[positions] += 1
+            self.reward[positions] += reward
+            return
+        while node != NO_NODE:
+            self.visits[node] += 1
+            self.reward[node] += reward
+            node = self.parent[node]
+    # endregion
+
+    # region Getters
+    def get_current(self) -> int:
+        """Returns the node the cursor is at."""
+        return self.current
+
+    def get_action(self, node: int) -> 'Action':
+        return self.actions[node]
+
+    def get_path(self, node: int) -> List[int]:
+        """Returns the nodes from `node` up to the root, excluding the root."""
+        path = []
+        while node != self.ROOT:
+            path.append(node)
+            node = self.parent[node]
+        return path
+
+    def get_children(self, node: int) -> range:
+        node = self.position[node]
+        first = self.first_child[node]
+        return range(first, first + self.child_count[node])
+
+    def get_average_reward(self, node: int) -> float:
+        node = self.position[node]
+        return self.reward[node] / self.visits[node] if self.visits[node] > 0 else -np.inf
+
+    def get_best_child_by_average(self, node: int) -> int:
+        """Returns the child of the node with the highest average reward, or `NO_NODE` if it has no children."""
+        node = self.position[node]
+        count = self.child_count[node]
+        if count == 0:
+            return NO_NODE
+        first = self.first_child[node]
+        positions = self.position[first:first + count]
+        visits = self.visits[positions]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            averages = np.where(visits > 0, self.reward[positions] / visits, -np.inf)
+        return first + int(np.argmax(averages))
+
+    def get_best_child_by_ucb(self, node: int, c_value: float) -> int:
+        """Returns the child of the node with the highest UCB value, or `NO_NODE` if it has no children. Unvisited
+        children come first."""
+        node = self.position[node]
+        count = self.child_count[node]
+        if count == 0:
+            return NO_NODE
+        first = self.first_child[node]
+        positions = self.position[first:first + count]
+        visits = self.visits[positions]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ucb_values = self.reward[positions] / visits + c_value * np.sqrt(np.log(self.visits[node]) / visits)
+        ucb_values[visits == 0] = sys.float_info.max
+        return first + int(np.argmax(ucb_values))
+
+    def get_statistics(self, depth: int) -> Dict[Any, Tuple[int, float]]:
+        """Returns the visits and reward of the visited positions down to `depth`, keyed by the keys of their states, so
+        the statistics of trees built from the same observation can be summed. It needs transpositions."""
+        return {key: (int(self.visits[node]), float(self.reward[node])) for key, node in self.transpositions.items()
+                if 0 < self.depth[node] <= depth and self.visits[node] > 0}
+
+    def get_random_child(self, node: int) -> int:
+        node = self.position[node]
+        return int(self.first_child[node]) + random.randrange(self.child_count[node])
+
+    def get_amount_of_children(self, node: int) -> int:
+        return int(self.child_count[self.position[node]])
+
+    def get_is_materialized(self, node: int) -> bool:
+        """Returns whether the state of the node has been built."""
+        return bool(self.materialized[node])
+
+    def get_is_unvisited(self, node: int) -> bool:
+        return self.visits[self.position[node]] == 0
+
+    def get_is_terminal(self, forward_model: 'ForwardModel') -> bool:
+        """Returns whether the node at the cursor is terminal (as in the game is over or the turn is finished)."""
+        return forward_model.is_terminal(self.observation) or forward_model.is_turn_finished(self.observation)
+
+    def get_size(self) -> int:
+        """Returns the amount of nodes of the tree."""
+        return self.size
+
+    def get_amount_of_positions(self) -> int:
+        """Returns the amount of distinct positions of the tree, which is its size without transpositions."""
+        return self.size if self.transpositions is None else len(self.transpositions)
+
+    def get_max_depth(self) -> int:
+        return int(self.depth[:self.size].max())
+    # endregion
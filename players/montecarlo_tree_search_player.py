@@ -1,17 +1,27 @@
+from collections import defaultdict
+from multiprocessing import Pool
+from typing import Any, Dict, List, Optional, Tuple
 from games import Action, Observation, ForwardModel
 from heuristics import Heuristic
-from players.montecarlo_tree_search import MontecarloTreeSearchNode
-from players import Player
+from players.montecarlo_tree_search import MontecarloTreeSearchTree
+from players import Player, ThinkStatistics
+import math
+import random
 import time
 
 # Ali
 
 class MontecarloTreeSearchPlayer(Player):
-    """Entity that plays a game by using the Monte Carlo Tree Search algorithm to choose all actions in a turn."""
-    def __init__(self, heuristic: 'Heuristic', c_value: float):
+    """Entity that plays a game by using the Monte Carlo Tree Search algorithm to choose all actions in a turn. With
+    more than one worker, each worker process builds its own tree from the observation with a different seed and the
+    statistics of the trees are summed to choose the turn (root parallelization). The workers are kept between turns
+    until `close` is called."""
+    def __init__(self, heuristic: 'Heuristic', c_value: float, workers: int = 1):
         super().__init__()
         self.heuristic = heuristic
         self.c_value = c_value
+        self.workers = workers
+        self.pool = None
         self.turn = []
         self.full_rollout = False
 
@@ -21,39 +31,105 @@ class MontecarloTreeSearchPlayer(Player):
 # region Methods
     def think(self, observation: 'Observation', forward_model: 'ForwardModel', budget: float) -> None:
         self.turn.clear()
+        if self.workers > 1:
+            self.think_in_parallel(observation, forward_model, budget)
+            return
 
         # compute the turn
-        t0 = time.time()
-        root = MontecarloTreeSearchNode(observation, self.heuristic, None)
-        self.forward_model_visits += root.extend(forward_model, self.visited_states)
-        current_node = root
-        action_points_per_turn = observation.get_game_parameters().get_action_points_per_turn()
+        tree = self.search(observation, forward_model, budget)
+
+        # retrieve the turn
+        current_node = tree.ROOT
+        for _ in range(observation.get_game_parameters().get_action_points_per_turn()):
+            best_child = tree.get_best_child_by_average(current_node)
+            if best_child == tree.NO_NODE:
+                break
+            self.turn.append(tree.get_action(best_child))
+            current_node = best_child
+
+    def search(self, observation: 'Observation', forward_model: 'ForwardModel', budget: float) \
+            -> 'MontecarloTreeSearchTree':
+        """Builds a tree from the observation for the given budget and returns it."""
+        self.start_budget(budget)
+        tree = MontecarloTreeSearchTree(observation, self.heuristic, transpositions=True)
+        self.forward_model_visits += tree.extend(forward_model, self.visited_states, lazy=True)
+
+        while self.get_is_budget_left():
+            # select down to a node without children
+            best_child = tree.get_best_child_by_ucb(tree.get_current(), self.c_value)
+            if best_child == tree.NO_NODE:
+                break
+            self.forward_model_visits += tree.move_to_child(best_child, forward_model, self.visited_states)
+            while tree.get_amount_of_children(best_child) > 0:
+                best_child = tree.get_best_child_by_ucb(best_child, self.c_value)
+                self.forward_model_visits += tree.move_to_child(best_child, forward_model, self.visited_states)
+
+            if not tree.get_is_unvisited(best_child) and not tree.get_is_terminal(forward_model):
+                self.forward_model_visits += tree.extend(forward_model, self.visited_states, lazy=True)
+                if tree.get_amount_of_children(best_child) > 0:
+                    best_child = tree.get_random_child(best_child)
+                    self.forward_model_visits += tree.move_to_child(best_child, forward_model, self.visited_states)
 
-        while time.time() - t0 < budget - 0.12:
-            best_child = current_node.get_best_child_by_ucb(self.c_value)
-            if best_child.get_amount_of_children() > 0:
-                current_node = best_child
+            if self.full_rollout:
+                reward, fm_visits = tree.full_rollout(forward_model, self.visited_states)
             else:
-                if not best_child.get_is_unvisited() and not best_child.get_is_terminal(forward_model):
-                    self.forward_model_visits += best_child.extend(forward_model, self.visited_states)
-                    best_child = best_child.get_random_child()
-
-                if self.full_rollout:
-                    reward, fm_visits = best_child.full_rollout(forward_model, self.visited_states)
-                else:
-                    reward, fm_visits = best_child.rollout(forward_model, self.visited_states)
-                self.forward_model_visits += fm_visits
-                best_child.backpropagate(reward)
-                current_node = root
+                reward, fm_visits = tree.rollout(forward_model, self.visited_states)
+            self.forward_model_visits += fm_visits
+            tree.backpropagate(best_child, reward)
+            tree.move_to_root(forward_model)
+        self.statistics.nodes += tree.get_size()
+        self.statistics.max_depth = max(self.statistics.max_depth, tree.get_max_depth())
+        return tree
 
-        # retrieve the turn
-        current_node = root
+    def think_in_parallel(self, observation: 'Observation', forward_model: 'ForwardModel', budget: float) -> None:
+        """Computes the turn from the summed statistics of one tree per worker. The workers keep part of the budget for
+        sending and summing the statistics, and the forward model budget, if any, is split between them."""
+        t0 = time.perf_counter()
+        if self.pool is None:
+            self.pool = Pool(self.workers)
+        action_points_per_turn = observation.get_game_parameters().get_action_points_per_turn()
+        forward_model_budget = None
+        if self.forward_model_budget is not None:
+            forward_model_budget = self.forward_model_budget / self.workers
+        tasks = [(self.heuristic, self.c_value, self.full_rollout, observation, forward_model,
+                  budget - (time.perf_counter() - t0) - 0.05, forward_model_budget, action_points_per_turn, random.randrange(2 ** 32))
+                 for _ in range(self.workers)]
+
+        # sum the statistics of the trees
+        statistics: Dict[Any, List[float]] = defaultdict(lambda: [0, 0.0])
+        for tree_statistics, fm_visits, visited_states, think_statistics in self.pool.starmap(search_in_worker, tasks):
+            self.statistics.add(think_statistics)
+            for key, (visits, reward) in tree_statistics.items():
+                statistics[key][0] += visits
+                statistics[key][1] += reward
+            self.forward_model_visits += fm_visits
+            for key, count in visited_states.items():
+                self.visited_states[key] += count
+
+        # retrieve the turn, choosing each action by the summed average reward of the state it leads to
+        new_observation = observation.clone()
         for _ in range(action_points_per_turn):
-            best_child = current_node.get_best_child_by_average()
-            if best_child is None:
+            best_action = None
+            best_reward = -math.inf
+            for action in new_observation.get_actions():
+                undo = forward_model.step_with_undo(new_observation, action)
+                if new_observation.get_key() in statistics:
+                    visits, reward = statistics[new_observation.get_key()]
+                    if reward / visits > best_reward:
+                        best_reward = reward / visits
+                        best_action = action
+                forward_model.unstep(new_observation, undo)
+            if best_action is None:
                 break
-            self.turn.append(best_child.get_action())
-            current_node = best_child
+            self.turn.append(best_action)
+            forward_model.step(new_observation, best_action)
+
+    def close(self) -> None:
+        """Stops the worker processes, if any, waiting for them to exit."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
 
     def get_action(self, index: int) -> 'Action':
         """Returns the next action in the turn."""
@@ -64,5 +140,23 @@ class MontecarloTreeSearchPlayer(Player):
 
 # region Override
     def __str__(self):
+        if self.workers > 1:
+            return f"MontecarloTreeSearchPlayer[{self.c_value}][{self.workers}]"
         return f"MontecarloTreeSearchPlayer[{self.c_value}]"
-# endregion
\ No newline at end of file
+# endregion
+
+
+def search_in_worker(heuristic: 'Heuristic', c_value: float, full_rollout: bool, observation: 'Observation',
+                     forward_model: 'ForwardModel', budget: float, forward_model_budget: Optional[float], depth: int,
+                     seed: int) \
+        -> Tuple[Dict[Any, Tuple[int, float]], int, defaultdict, 'ThinkStatistics']:
+    """Builds a tree in a worker process and returns its statistics down to `depth`, its forward model visits, its
+    visited states and the statistics of the search."""
+    random.seed(seed)
+    player = MontecarloTreeSearchPlayer(heuristic, c_value)
+    player.full_rollout = full_rollout
+    player.set_forward_model_budget(forward_model_budget)
+    player.start_think_statistics()
+    tree = player.search(observation, forward_model, budget)
+    return tree.get_statistics(depth), player.forward_model_visits, player.visited_states, \
+        player.finish_think_statistics()
@@ -1,15 +1,16 @@
 from games import Action, Observation, ForwardModel
 from heuristics import Heuristic
-from players.montecarlo_tree_search import MontecarloTreeSearchNode
+from players.montecarlo_tree_search import MontecarloTreeSearchTree, GreedyPolicyCache
 from players import Player
-import time
 
 class NonExploringMontecarloTreeSearchPlayer(Player):
-    """Entity that plays a game by using the Monte Carlo Tree Search algorithm to choose all actions in a turn."""
-    def __init__(self, heuristic: 'Heuristic'):
+    """Entity that plays a game by using the Monte Carlo Tree Search algorithm to choose all actions in a turn, with
+    greedy rollouts. The greedy actions of the positions met in the rollouts are kept in a cache between turns."""
+    def __init__(self, heuristic: 'Heuristic', policy_cache_size: int = 100000):
         super().__init__()
         self.heuristic = heuristic
         self.c_value = 0.0
+        self.policy_cache = GreedyPolicyCache(policy_cache_size)
         self.turn = []
 
 
@@ -19,33 +20,44 @@ class NonExploringMontecarloTreeSearchPlayer(Player):
         self.turn.clear()
 
         # compute the turn
-        t0 = time.time()
-        root = MontecarloTreeSearchNode(observation, self.heuristic, None)
-        self.forward_model_visits += root.extend(forward_model, self.visited_states)
-        root.reward_children()
-        current_node = root
-
-        while time.time() - t0 < budget - 0.12:
-            best_child = current_node.get_best_child_by_ucb(self.c_value)
-            if best_child.get_amount_of_children() > 0:
-                current_node = best_child
-            else:
-                if not best_child.get_is_unvisited() and not best_child.get_is_terminal(forward_model):
-                    self.forward_model_visits += best_child.extend(forward_model, self.visited_states)
-                    best_child.reward_children()
-                    best_child = best_child.get_best_child_by_average()
-                reward, fm_visits = best_child.deterministic_rollout(forward_model, self.visited_states)
-                self.forward_model_visits += fm_visits
-                best_child.backpropagate(reward)
-                current_node = root
+        self.start_budget(budget)
+        policy_cache_hits = self.policy_cache.get_hits()
+        policy_cache_misses = self.policy_cache.get_misses()
+        tree = MontecarloTreeSearchTree(observation, self.heuristic)
+        self.forward_model_visits += tree.extend(forward_model, self.visited_states, reward_children=True)
+
+        while self.get_is_budget_left():
+            # select down to a node without children
+            best_child = tree.get_best_child_by_ucb(tree.get_current(), self.c_value)
+            if best_child == tree.NO_NODE:
+                break
+            tree.move_to_child(best_child, forward_model)
+            while tree.get_amount_of_children(best_child) > 0:
+                best_child = tree.get_best_child_by_ucb(best_child, self.c_value)
+                tree.move_to_child(best_child, forward_model)
+
+            if not tree.get_is_unvisited(best_child) and not tree.get_is_terminal(forward_model):
+                self.forward_model_visits += tree.extend(forward_model, self.visited_states, reward_children=True)
+                if tree.get_amount_of_children(best_child) > 0:
+                    best_child = tree.get_best_child_by_average(best_child)
+                    tree.move_to_child(best_child, forward_model)
+            reward, fm_visits = tree.deterministic_rollout(forward_model, self.visited_states, self.policy_cache)
+            self.forward_model_visits += fm_visits
+            tree.backpropagate(best_child, reward)
+            tree.move_to_root(forward_model)
+
+        self.statistics.nodes += tree.get_size()
+        self.statistics.max_depth = max(self.statistics.max_depth, tree.get_max_depth())
+        self.statistics.cache_hits += self.policy_cache.get_hits() - policy_cache_hits
+        self.statistics.cache_misses += self.policy_cache.get_misses() - policy_cache_misses
 
         # retrieve the turn
-        current_node = root
+        current_node = tree.ROOT
         for _ in range(observation.get_game_parameters().get_action_points_per_turn()):
-            best_child = current_node.get_best_child_by_average()
-            if best_child is None:
+            best_child = tree.get_best_child_by_average(current_node)
+            if best_child == tree.NO_NODE:
                 break
-            self.turn.append(best_child.get_action())
+            self.turn.append(tree.get_action(best_child))
             current_node = best_child
 
     def get_action(self, index: int) -> 'Action':
@@ -1,3 +1,4 @@
-__all__ = ('TurnGenome')
+__all__ = ('TurnGenome', 'TurnPrefixCache')
 
-from .turn_genome import TurnGenome
\ No newline at end of file
+from .turn_prefix_cache import TurnPrefixCache
+from .turn_genome import TurnGenome
@@ -0,0 +1,83 @@
+from collections import OrderedDict, defaultdict
+from typing import List, Tuple
+from games import Action, Observation, ForwardModel
+from heuristics import Heuristic
+
+
+class TurnPrefixCache:
+    """Bounded cache of the states reached by the prefixes of the turns of a think, keyed by their actions. The state
+    of a prefix is simulated once from the state of its longest cached prefix, so genomes that share a prefix share its
+    simulation. The least recently used entries are evicted first. Cached states are shared and must not be
+    modified."""
+    def __init__(self, observation: 'Observation', capacity: int = 10000):
+        self.root = observation.clone()
+        self.capacity = capacity
+        self.states: 'OrderedDict[Tuple[Action, ...], Observation]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # region Methods
+    def get_state(self, actions: List['Action'], length: int, forward_model: 'ForwardModel',
+                  visited_states: defaultdict) -> Tuple['Observation', int]:
+        """Returns the state after the first `length` actions and the forward model visits spent to simulate it."""
+        if length == 0:
+            return self.root, 0
+        key = tuple(actions[:length])
+        state = self.states.get(key)
+        if state is not None:
+            self.hits += 1
+            self.states.move_to_end(key)
+            return state, 0
+        self.misses += 1
+
+        parent, fm_visits = self.get_state(actions, length - 1, forward_model, visited_states)
+        state = parent.clone()
+        forward_model.step(state, actions[length - 1])
+        visited_states[state.get_key()] += 1
+        self.states[key] = state
+        if len(self.states) > self.capacity:
+            self.states.popitem(last=False)
+        return state, fm_visits + 1
+
+    def evaluate(self, actions: List['Action'], forward_model: 'ForwardModel', heuristic: 'Heuristic',
+                 visited_states: defaultdict) -> Tuple[float, int]:
+        """Returns the reward of the state after all the actions and the forward model visits spent to simulate it. That
+        state is not cached: the last action is stepped and reverted on the state of its prefix."""
+        if len(actions) == 0:
+            return heuristic.get_reward(self.root), 0
+        state, fm_visits = self.get_state(actions, len(actions) - 1, forward_model, visited_states)
+        undo = forward_model.step_with_undo(state, actions[-1])
+        visited_states[state.get_key()] += 1
+        reward = heuristic.get_reward(state)
+        forward_model.unstep(state, undo)
+        return reward, fm_visits + 1
+
+    def clear(self) -> None:
+        self.states.clear()
+        self.hits = 0
+        self.misses = 0
+    # endregion
+
+    # region Getters
+    def get_root(self) -> 'Observation':
+        return self.root
+
+    def get_hits(self) -> int:
+        return self.hits
+
+    def get_misses(self) -> int:
+        return self.misses
+
+    def get_hit_rate(self) -> float:
+        """Returns the fraction of lookups that were hits, or 0 if there were none."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def get_size(self) -> int:
+        return len(self.states)
+    # endregion
+
+    # region Override
+    def __len__(self) -> int:
+        return self.get_size()
+    # endregion
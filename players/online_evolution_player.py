@@ -1,20 +1,26 @@
-from typing import List
+from typing import List, Optional
 from games import Action, Observation, ForwardModel
 from heuristics import Heuristic
-from players.online_evolution import TurnGenome
-from players import Player
-import time
+from players.online_evolution import TurnGenome, TurnPrefixCache
+from players import Player, FitnessCache
 import random
 
 class OnlineEvolutionPlayer(Player):
-    def __init__(self, heuristic: 'Heuristic', population_size: int, mutation_rate: float, survival_rate: float) -> None:
-        """Entity that plays a game by using the Online Evolution algorithm to choose all actions in a turn."""
+    def __init__(self, heuristic: 'Heuristic', population_size: int, mutation_rate: float, survival_rate: float,
+                 prefix_cache_size: int = 10000, fitness_cache_size: int = 100000) -> None:
+        """Entity that plays a game by using the Online Evolution algorithm to choose all actions in a turn. The states
+        reached by the prefixes of the genomes and the rewards of the genomes are cached during each think, up to
+        `prefix_cache_size` and `fitness_cache_size` entries."""
         super().__init__()
         self.population_size = population_size
         self.mutation_rate = mutation_rate
         self.survival_rate = survival_rate
         self.heuristic = heuristic
         self.random_new_valid_action = False
+        self.prefix_cache_size = prefix_cache_size
+        self.prefix_cache: Optional['TurnPrefixCache'] = None
+        self.fitness_cache_size = fitness_cache_size
+        self.fitness_cache: Optional['FitnessCache'] = None
         self.turn = []
 
     def set_random_new_valid_action(self, value = True):
@@ -26,28 +32,32 @@ class OnlineEvolutionPlayer(Player):
         """Computes a list of actions for a complete turn using the Online Evolution algorithm and returns them in order each time it's called during the turn."""
         self.turn.clear()
 
-        t0 = time.time()
+        self.start_budget(budget)
         population: List['TurnGenome'] = []
         killed: List['TurnGenome'] = []
 
-        new_observation = observation.clone()
+        self.prefix_cache = TurnPrefixCache(observation, self.prefix_cache_size)
+        self.fitness_cache = FitnessCache(self.prefix_cache.get_root(), self.fitness_cache_size)
         # initial population
         for i in range(self.population_size):
             genome = TurnGenome()
-            observation.copy_into(new_observation)
-            self.forward_model_visits += genome.random(new_observation, forward_model, self.visited_states)
+            self.forward_model_visits += genome.random(self.prefix_cache, forward_model, self.visited_states)
             population.append(genome)
             killed.append(genome)
 
-        while time.time() - t0 < budget - 0.1:
+        while self.get_is_budget_left():
             # evaluate the new genomes
             for genome in killed:
-                observation.copy_into(new_observation)
-                for action in genome.get_actions():
-                    forward_model.step(new_observation, action)
-                    self.visited_states[new_observation] += 1
-                    self.forward_model_visits += 1
-                genome.set_reward(self.heuristic.get_reward(new_observation))
+                reward = self.fitness_cache.get(genome.get_actions())
+                if reward is None:
+                    reward, fm_visits = self.prefix_cache.evaluate(genome.get_actions(), forward_model, self.heuristic,
+                                                                   self.visited_states)
+                    self.forward_model_visits += fm_visits
+                    self.fitness_cache.put(genome.get_actions(), reward)
+                else:
+                    # cached genomes still spend the forward model budget
+                    self.charge_budget(1)
+                genome.set_reward(reward)
 
             # kill the worst genomes
             killed.clear()
@@ -65,15 +75,16 @@ class OnlineEvolutionPlayer(Player):
                     parent_b_index = random.randrange(first_killed_genome_index)
 
                 # crossover
-                observation.copy_into(new_observation)
                 self.forward_model_visits += killed_genome.\
-                    crossover(population[parent_a_index], population[parent_b_index], new_observation, forward_model, self.visited_states)
+                    crossover(population[parent_a_index], population[parent_b_index], self.prefix_cache, forward_model, self.visited_states)
 
                 # mutate
                 if random.random() < self.mutation_rate:
-                    observation.copy_into(new_observation)
                     self.forward_model_visits += killed_genome.\
-                        mutate_at_random_index(new_observation, forward_model, self.heuristic, self.random_new_valid_action, self.visited_states, self.verbose)
+                        mutate_at_random_index(self.prefix_cache, forward_model, self.heuristic, self.random_new_valid_action, self.visited_states, self.verbose)
+
+        self.statistics.cache_hits += self.fitness_cache.get_hits()
+        self.statistics.cache_misses += self.fitness_cache.get_misses()
 
         # select the best genome to use for the turn
         self.turn = population[0].get_actions()
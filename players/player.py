@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from typing import Dict
+from typing import Dict, List, Optional
 from games import Action, Observation, ForwardModel
+from players.deadline import Deadline
+from players.think_statistics import ThinkStatistics
+import time
 
 class Player(ABC):
     """Abstract class that will define a player of the game"""
@@ -10,6 +13,13 @@ class Player(ABC):
         self.timeout = False
         self.forward_model_visits = 0
         self.visited_states = defaultdict(int)
+        self.forward_model_budget: Optional[int] = None
+        self.deadline: Optional['Deadline'] = None
+        self.budget_last_visits = 0
+        self.budget_spent = 0
+        self.statistics = ThinkStatistics()
+        self.think_statistics: List['ThinkStatistics'] = []
+        self.statistics_start = (0.0, 0, 0, 0)
 
     #@abstractmethod
     #def think(self, observation: 'Observation', forward_model: 'ForwardModel', budget: float) -> 'Action':
@@ -34,6 +44,53 @@ class Player(ABC):
         """Set the timeout of the player"""
         self.timeout = timeout
 
+    def set_forward_model_budget(self, forward_model_budget: Optional[int]):
+        """Set the maximum forward model visits per turn. If it is set, the player thinks until it is spent instead of
+        until the time budget is over."""
+        self.forward_model_budget = forward_model_budget
+
+    def start_budget(self, budget: float, reserve: float = 0.02):
+        """Starts a `Deadline` of `budget` seconds, keeping `reserve` seconds for the work after the search, and counts
+        the forward model budget spent from now"""
+        self.deadline = Deadline(budget, reserve)
+        self.budget_last_visits = self.forward_model_visits
+        self.budget_spent = 0
+
+    def charge_budget(self, units: int):
+        """Charges work that doesn't visit the forward model, such as cache hits, to the forward model budget"""
+        self.budget_spent += units
+
+    def get_is_budget_left(self, fraction: float = 1) -> bool:
+        """Returns whether there is budget for another iteration since `start_budget`: `fraction` of the forward model
+        budget if it is set, or else time before the deadline. It must be called once per iteration. Each iteration is
+        charged its forward model visits and at least one unit, so iterations that replay known states or hit caches
+        still spend the forward model budget"""
+        if self.forward_model_budget is not None:
+            self.budget_spent += max(self.forward_model_visits - self.budget_last_visits, 1)
+            self.budget_last_visits = self.forward_model_visits
+            budget_left = self.budget_spent <= self.forward_model_budget * fraction
+        else:
+            budget_left = self.deadline.get_is_time_left()
+        if budget_left:
+            self.statistics.iterations += 1
+        return budget_left
+
+    def start_think_statistics(self):
+        """Starts the statistics of a think"""
+        self.statistics = ThinkStatistics()
+        self.statistics_start = (time.perf_counter(), self.forward_model_visits, self.get_heuristic_calls(),
+                                 Observation.clones)
+
+    def finish_think_statistics(self) -> 'ThinkStatistics':
+        """Finishes the statistics of the think, adding the counts since `start_think_statistics`, and keeps them"""
+        start_time, forward_model_visits, heuristic_calls, clones = self.statistics_start
+        self.statistics.wall_time = time.perf_counter() - start_time
+        self.statistics.forward_model_calls += self.forward_model_visits - forward_model_visits
+        self.statistics.heuristic_calls += self.get_heuristic_calls() - heuristic_calls
+        self.statistics.clones += Observation.clones - clones
+        self.think_statistics.append(self.statistics)
+        return self.statistics
+
     def get_visited_states_count(self) -> int:
         """Returns the number of times the heuristic was called"""
         return len(self.visited_states.keys())
@@ -41,3 +98,23 @@ class Player(ABC):
     def get_forward_model_visits(self) -> int:
         """Returns the number of times the forward model was called"""
         return self.forward_model_visits
+
+    def get_heuristic_calls(self) -> int:
+        """Returns the number of times the heuristic of the player was called, 0 if it has none"""
+        heuristic = getattr(self, 'heuristic', None)
+        return heuristic.get_calls() if heuristic is not None else 0
+
+    def get_think_statistics(self) -> List['ThinkStatistics']:
+        """Returns the statistics of every think"""
+        return self.think_statistics
+
+    def close(self) -> None:
+        """Releases the resources the player keeps between thinks, such as worker processes. It must be called when
+        the match ends"""
+        pass
+
+    def __enter__(self) -> 'Player':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,69 @@
+from typing import Dict
+
+
+class ThinkStatistics:
+    """
+    Statistics of a single `Player.think`, started and finished by `Player.start_think_statistics` and
+    `Player.finish_think_statistics`.
+
+    Attributes:
+        iterations (int): Search iterations, counted by `Player.get_is_budget_left`.
+        forward_model_calls (int): Forward model visits of the player.
+        heuristic_calls (int): Calls to `Heuristic.get_reward`.
+        clones (int): Observations cloned or copied.
+        nodes (int): Nodes allocated by tree searches, 0 if the player doesn't build a tree.
+        max_depth (int): Depth of the deepest node of the tree, 0 if the player doesn't build a tree.
+        cache_hits (int): Lookups of the fitness or policy cache of the player that were hits, 0 if it has none.
+        cache_misses (int): Lookups of the fitness or policy cache of the player that were misses, 0 if it has none.
+        wall_time (float): Seconds spent thinking.
+    """
+    def __init__(self):
+        self.iterations = 0
+        self.forward_model_calls = 0
+        self.heuristic_calls = 0
+        self.clones = 0
+        self.nodes = 0
+        self.max_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.wall_time = 0.0
+
+    # region Methods
+    def add(self, other: 'ThinkStatistics') -> None:
+        """Adds the counts of another search of the same think, such as one made by a worker process. The forward model
+        calls are not added, as players already add the visits of their searches to their own."""
+        self.iterations += other.iterations
+        self.heuristic_calls += other.heuristic_calls
+        self.clones += other.clones
+        self.nodes += other.nodes
+        self.max_depth = max(self.max_depth, other.max_depth)
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "iterations": self.iterations,
+            "forward_model_calls": self.forward_model_calls,
+            "heuristic_calls": self.heuristic_calls,
+            "clones": self.clones,
+            "nodes": self.nodes,
+            "max_depth": self.max_depth,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "wall_time": self.wall_time,
+            "iterations_per_second": self.get_iterations_per_second(),
+        }
+    # endregion
+
+    # region Getters
+    def get_iterations_per_second(self) -> float:
+        return self.iterations / self.wall_time if self.wall_time > 0 else 0.0
+    # endregion
+
+    # region Override
+    def __str__(self):
+        return f"ThinkStatistics[{self.iterations} iterations, {self.forward_model_calls} fm calls, " \
+               f"{self.heuristic_calls} heuristic calls, {self.clones} clones, {self.nodes} nodes, " \
+               f"depth {self.max_depth}, {self.cache_hits} cache hits, {self.cache_misses} cache misses, " \
+               f"{self.wall_time:.3f}s]"
+    # endregion
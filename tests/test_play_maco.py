@@ -0,0 +1,598 @@
+from collections import defaultdict
+import random
+import signal
+import numpy as np
+from games.maco import (MacoAction, MacoBatchForwardModel, MacoBatchState, MacoBitboard, MacoForwardModel,
+                        MacoGameParameters, MacoGameState, MacoPiece, MacoPieceType)
+from games.maco.maco_score_kernel import board_to_array
+from games.maco.maco_serialization import (decode_action, decode_actions, decode_observation, encode_action,
+                                           encode_actions, encode_observation)
+from heuristics import SimpleHeuristic
+from players import (BridgeBurningMontecarloTreeSearchPlayer, Deadline, FitnessCache, GeneticPlayer,
+                     GreedyActionPlayer, GreedyTurnPlayer, MontecarloTreeSearchPlayer,
+                     NonExploringMontecarloTreeSearchPlayer, OnlineEvolutionPlayer)
+from players.genetic.genetic_algorithm import GeneticAlgorithm
+from players.montecarlo_tree_search import MontecarloTreeSearchTree
+from players.online_evolution import TurnPrefixCache
+
+
+def random_game_state(parameters: 'MacoGameParameters', rng: random.Random) -> 'MacoGameState':
+    """Returns a game state whose board is filled at random."""
+    game_state = MacoGameState(parameters)
+    fill = rng.random()
+    for position in game_state.board:
+        if rng.random() < fill:
+            game_state.board[position] = rng.randrange(2)
+    return game_state
+
+
+def test_score_kernel_matches_python_scorer():
+    rng = random.Random(0)
+    forward_model = MacoForwardModel()
+    for board_size, win_length in [(8, 6), (8, 4), (5, 5), (6, 3), (3, 4), (12, 6)]:
+        parameters = MacoGameParameters(board_size=board_size, win_condition_length=win_length)
+        for _ in range(50):
+            game_state = random_game_state(parameters, rng)
+            expected = tuple(forward_model.calculate_player_score(game_state, game_state.board, board_size, player)
+                             for player in (0, 1))
+            assert forward_model.calculate_player_scores(game_state) == expected
+
+
+def test_score_kernel_scores_stacks_of_boards():
+    rng = random.Random(1)
+    forward_model = MacoForwardModel()
+    parameters = MacoGameParameters(board_size=8, win_condition_length=5)
+    game_states = [random_game_state(parameters, rng) for _ in range(64)]
+    boards = np.stack([board_to_array(game_state.board, 8) for game_state in game_states]).reshape(4, 16, 8, 8)
+
+    scores = forward_model.calculate_scores(boards, 5)
+
+    assert scores.shape == (4, 16, 2)
+    for index, game_state in enumerate(game_states):
+        for player in (0, 1):
+            expected = forward_model.calculate_player_score(game_state, game_state.board, 8, player)
+            assert scores[index // 16, index % 16, player] == expected
+
+
+def test_batch_forward_model_matches_scalar_model():
+    rng = random.Random(2)
+    forward_model = MacoForwardModel()
+    batch_forward_model = MacoBatchForwardModel()
+    parameters = MacoGameParameters(board_size=5, win_condition_length=4, pieces_per_player=30, explode_per_player=3,
+                                    block_per_player=3)
+    observations = [MacoGameState(parameters).get_observation() for _ in range(32)]
+    batch = MacoBatchState(parameters, len(observations))
+    batch.set_states(observations)
+
+    for _ in range(60):
+        active = np.array([not forward_model.is_terminal(observation) for observation in observations])
+        if not active.any():
+            break
+        actions = [MacoAction(MacoPiece(rng.choice(list(MacoPieceType))), (rng.randrange(5), rng.randrange(5)))
+                   if rng.random() < 0.3 else observation.get_random_action(rng) for observation in observations]
+        cells, piece_types = batch_forward_model.encode_actions(actions, 5)
+
+        rewards, terminal = batch_forward_model.step_batch(batch, cells, piece_types, active)
+        for index, observation in enumerate(observations):
+            if active[index]:
+                forward_model.step(observation, actions[index])
+
+        expected = MacoBatchState(parameters, len(observations))
+        expected.set_states(observations)
+        for name in ['boards', 'current_turn', 'action_points_left', 'scores', 'pieces', 'blocked_rows', 'terminal']:
+            assert np.array_equal(getattr(batch, name), getattr(expected, name)), name
+        for index, observation in enumerate(observations):
+            player = observation.current_turn
+            assert rewards[index] == expected.scores[index, player] - expected.scores[index, 1 - player]
+        assert np.array_equal(terminal, expected.terminal)
+
+        batch_forward_model.on_turn_ended_batch(batch, active)
+        for index, observation in enumerate(observations):
+            if active[index]:
+                forward_model.on_turn_ended(observation)
+
+
+def run_with_timeout(function, seconds: float):
+    """Runs the function, failing if it doesn't return within the given seconds."""
+    def on_timeout(signum, frame):
+        raise TimeoutError(f"did not return within {seconds} seconds")
+    previous_handler = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        return function()
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def test_players_think_within_forward_model_budget():
+    random.seed(3)
+    heuristic = SimpleHeuristic()
+    players = [GreedyActionPlayer(heuristic), GreedyTurnPlayer(heuristic), MontecarloTreeSearchPlayer(heuristic, 0.4),
+               BridgeBurningMontecarloTreeSearchPlayer(heuristic, 0.4),
+               NonExploringMontecarloTreeSearchPlayer(heuristic),
+               OnlineEvolutionPlayer(heuristic, 20, 0.1, 0.5), GeneticPlayer(heuristic, 20, 0.1, 0.2)]
+    parameters = MacoGameParameters(board_size=5, win_condition_length=4)
+    forward_model = MacoForwardModel()
+    for player in players:
+        # small boards make the searches run out of new states, which spend no forward model visits
+        player.set_forward_model_budget(1000)
+        game_state = MacoGameState(parameters)
+        while not forward_model.is_terminal(game_state):
+            observation = game_state.get_observation()
+            # the time budget is ignored when there is a forward model budget
+            run_with_timeout(lambda: player.think(observation, forward_model, 1000), 10)
+            for index in range(game_state.get_action_points_left()):
+                forward_model.step(game_state, player.get_action(index))
+            forward_model.on_turn_ended(game_state)
+
+
+def test_players_count_one_iteration_per_search_cycle():
+    random.seed(13)
+    observation = MacoGameState(MacoGameParameters()).get_observation()
+    player = MontecarloTreeSearchPlayer(SimpleHeuristic(), 0.4)
+    player.set_forward_model_budget(3000)
+    player.start_think_statistics()
+    tree = player.search(observation, MacoForwardModel(), 1000)
+    statistics = player.finish_think_statistics()
+    # every iteration descends several levels but backpropagates once through the root
+    assert tree.get_max_depth() > 1
+    assert statistics.iterations == tree.visits[tree.ROOT]
+
+    player = GreedyActionPlayer(SimpleHeuristic())
+    player.set_forward_model_budget(100)
+    player.start_think_statistics()
+    player.think(observation, MacoForwardModel(), 1000)
+    statistics = player.finish_think_statistics()
+    # every iteration evaluates one action
+    assert statistics.iterations == statistics.forward_model_calls == 100
+
+
+def test_turn_prefix_cache_simulates_each_prefix_once():
+    forward_model = MacoForwardModel()
+    heuristic = SimpleHeuristic()
+    observation = MacoGameState(MacoGameParameters()).get_observation()
+    first, second, third, fourth = observation.get_actions()[:8:2]
+    prefix_cache = TurnPrefixCache(observation, capacity=2)
+    visited_states = defaultdict(int)
+
+    def evaluate_from_scratch(actions: list) -> float:
+        state = observation.clone()
+        for action in actions:
+            forward_model.step(state, action)
+        return heuristic.get_reward(state)
+
+    # each turn steps its new prefixes and its last action, and reuses the prefixes simulated before
+    for actions, fm_visits, hits, misses in [([first, second, third], 3, 0, 2), ([first, second, fourth], 1, 1, 2),
+                                             ([first, third, second], 2, 2, 3), ([second, first, third], 3, 2, 5)]:
+        reward, visits = prefix_cache.evaluate(actions, forward_model, heuristic, visited_states)
+        assert reward == evaluate_from_scratch(actions)
+        assert (visits, prefix_cache.get_hits(), prefix_cache.get_misses()) == (fm_visits, hits, misses)
+        assert len(prefix_cache) <= 2
+    assert prefix_cache.get_root() == observation
+
+
+def test_online_evolution_charges_cached_generations():
+    random.seed(4)
+    player = OnlineEvolutionPlayer(SimpleHeuristic(), 20, 0.1, 0.5)
+    player.set_forward_model_budget(1000)
+    player.start_think_statistics()
+    player.think(MacoGameState(MacoGameParameters()).get_observation(), MacoForwardModel(), 1000)
+    # every generation evaluates the 10 killed genomes, which cost at least one unit each even when cached
+    assert player.finish_think_statistics().iterations <= 1000 // 10
+    assert player.fitness_cache.get_hits() > 0
+
+
+def test_fitness_cache_keeps_the_order_of_turns_that_end_the_game():
+    forward_model = MacoForwardModel()
+    game_state = MacoGameState(MacoGameParameters())
+    for y in range(4):
+        forward_model.set_cell(game_state, (0, y), 0)
+    observation = game_state.get_observation()
+    action_table = observation.get_game_parameters().get_action_table()
+    first, second, other, more, last = [action_table[x * 8 + y][0] for x, y in [(0, 4), (0, 5), (5, 5), (6, 6), (7, 0)]]
+    algorithm = GeneticAlgorithm(SimpleHeuristic(), 10, 0.1, 0.2, 0, defaultdict(int))
+    fitness_cache = FitnessCache(observation)
+
+    # the game ends on the last action here, but after the second action of the other order
+    algorithm.evaluate_individual([first, other, second], observation, forward_model, fitness_cache)
+    assert fitness_cache.get([first, second, other]) is None
+    assert fitness_cache.get([first, other, second]) is not None
+    # turns that don't end the game reach the same position in any order
+    algorithm.evaluate_individual([other, more, last], observation, forward_model, fitness_cache)
+    assert fitness_cache.get([last, other, more]) is not None
+
+
+def test_genetic_player_returns_its_best_turn_when_the_budget_runs_out():
+    observation = MacoGameState(MacoGameParameters()).get_observation()
+    for forward_model_budget, generations in [(1, None), (600, None), (10 ** 6, 3)]:
+        random.seed(15)
+        player = GeneticPlayer(SimpleHeuristic(), 20, 0.1, 0.2, generations)
+        player.set_forward_model_budget(forward_model_budget)
+        player.start_think_statistics()
+        player.think(observation, MacoForwardModel(), 1000)
+        statistics = player.finish_think_statistics()
+        turn = [player.get_action(index) for index in range(3)]
+        assert all(action in observation.get_actions() for action in turn)
+        if forward_model_budget == 1:
+            # the random population spends the budget before any generation, so a random individual is played
+            assert statistics.iterations == 0
+            continue
+        if generations is not None:
+            assert statistics.iterations == generations
+        # the turn is the fittest individual evaluated by any generation
+        assert statistics.iterations > 0
+        assert player.fitness_cache.get(turn) == max(player.fitness_cache.entries.values())
+
+
+def evaluate_individual_by_copy(individual: list, observation: 'MacoObservation', forward_model: 'MacoForwardModel',
+                                heuristic: 'SimpleHeuristic') -> float:
+    """Returns the fitness of the individual as the genetic algorithm computed it before it used undo records: each
+    simulation clones the observation and plays the individual and the random responses on the clone."""
+    total_reward = 0
+    num_simulations = 2
+    for _ in range(num_simulations):
+        new_observation = observation.clone()
+        for action in individual:
+            if forward_model.is_terminal(new_observation) or forward_model.is_turn_finished(new_observation):
+                break
+            forward_model.step(new_observation, action)
+        while not forward_model.is_turn_finished(new_observation):
+            forward_model.step(new_observation, new_observation.get_random_action())
+        total_reward += heuristic.get_reward(new_observation)
+    return total_reward / num_simulations
+
+
+def test_genetic_algorithm_evaluates_like_the_copy_based_path():
+    rng = random.Random(16)
+    forward_model = MacoForwardModel()
+    heuristic = SimpleHeuristic()
+    algorithm = GeneticAlgorithm(heuristic, 10, 0.1, 0.2, 0, defaultdict(int))
+    parameters = MacoGameParameters(board_size=6, win_condition_length=4)
+    for _ in range(5):
+        game_state = MacoGameState(parameters)
+        while not forward_model.is_terminal(game_state):
+            observation = game_state.get_observation()
+            snapshot = get_state_snapshot(observation)
+            for length in (1, 2, 3):
+                # shorter individuals leave action points to the sampled responses
+                individual = [rng.choice(observation.get_actions()) for _ in range(length)]
+                seed = rng.randrange(2 ** 32)
+                random.seed(seed)
+                expected = evaluate_individual_by_copy(individual, observation, forward_model, heuristic)
+                random.seed(seed)
+                assert algorithm.evaluate_individual(individual, observation, forward_model) == expected
+                assert get_state_snapshot(observation) == snapshot
+
+            forward_model.step(game_state, get_random_test_action(game_state, rng))
+            if game_state.get_action_points_left() == 0:
+                forward_model.on_turn_ended(game_state)
+
+
+def test_nonexploring_player_reports_policy_cache_lookups():
+    random.seed(6)
+    player = NonExploringMontecarloTreeSearchPlayer(SimpleHeuristic())
+    player.set_forward_model_budget(2000)
+    observation = MacoGameState(MacoGameParameters()).get_observation()
+    for _ in range(2):
+        hits, misses = player.policy_cache.get_hits(), player.policy_cache.get_misses()
+        player.start_think_statistics()
+        player.think(observation, MacoForwardModel(), 1000)
+        statistics = player.finish_think_statistics()
+        # the cache is kept between thinks, so each think reports only its own lookups
+        assert statistics.cache_hits == player.policy_cache.get_hits() - hits
+        assert statistics.cache_misses == player.policy_cache.get_misses() - misses
+        assert statistics.cache_hits + statistics.cache_misses > 0
+
+
+def test_parallel_player_closes_its_workers():
+    random.seed(7)
+    observation = MacoGameState(MacoGameParameters()).get_observation()
+    with MontecarloTreeSearchPlayer(SimpleHeuristic(), 0.4, workers=2) as player:
+        player.set_forward_model_budget(200)
+        player.think(observation, MacoForwardModel(), 1000)
+        assert player.get_action(0) is not None
+        processes = player.pool._pool
+    assert player.pool is None
+    assert all(not process.is_alive() for process in processes)
+
+
+def get_state_snapshot(game_state: 'MacoGameState') -> tuple:
+    """Returns every field of a state that a step can change, in a comparable form."""
+    line_state = game_state.line_state
+    pieces = tuple(tuple(collection.get_amount(piece_type) for piece_type in MacoPieceType)
+                   for collection in (game_state.player_0_pieces, game_state.player_1_pieces))
+    return (dict(game_state.board.items()), game_state.player_0_score, game_state.player_1_score, pieces,
+            [counts.copy() for counts in line_state.counts], [lines.copy() for lines in line_state.score_lines],
+            line_state.winning_lines.copy(), line_state.empty_cells, game_state.zobrist_key, game_state.terminal,
+            game_state.winner, sorted(game_state.empty_cells), dict(game_state.blocked_rows),
+            game_state.action_points_left, game_state.current_turn)
+
+
+def get_random_test_action(game_state: 'MacoGameState', rng: random.Random) -> 'MacoAction':
+    """Returns a random action of any piece type, often invalid, or a valid regular piece action."""
+    board_size = game_state.game_parameters.board_size
+    if rng.random() < 0.4:
+        position = (rng.randrange(board_size), rng.randrange(board_size))
+        return MacoAction(MacoPiece(rng.choice(list(MacoPieceType))), position)
+    return game_state.get_observation().get_random_action(rng)
+
+
+def test_step_with_undo_restores_the_state_exactly():
+    rng = random.Random(5)
+    forward_model = MacoForwardModel()
+    for use_bitboard in (False, True):
+        parameters = MacoGameParameters(board_size=6, win_condition_length=4, explode_per_player=3,
+                                        block_per_player=3, use_bitboard=use_bitboard)
+        for _ in range(30):
+            game_state = MacoGameState(parameters)
+            for _ in range(rng.randrange(30)):
+                if forward_model.is_terminal(game_state):
+                    break
+                forward_model.step(game_state, get_random_test_action(game_state, rng))
+                forward_model.on_turn_ended(game_state)
+
+            snapshots = []
+            undos = []
+            for _ in range(rng.randrange(1, 8)):
+                # the order of the empty cells is restored too, so random choices among them repeat
+                snapshots.append((get_state_snapshot(game_state), list(game_state.empty_cells)))
+                undos.append(forward_model.step_with_undo(game_state, get_random_test_action(game_state, rng)))
+            for undo, snapshot in zip(reversed(undos), reversed(snapshots)):
+                forward_model.unstep(game_state, undo)
+                assert (get_state_snapshot(game_state), list(game_state.empty_cells)) == snapshot
+
+
+def run_deadline(get_cost, budget: float = 0.1) -> tuple:
+    """Runs a loop under a `Deadline` on a fake clock, where the iteration `i` takes `get_cost(i)` seconds, and returns
+    the elapsed seconds, the iterations and the clock reads."""
+    now = [0.0]
+    reads = [0]
+
+    def clock() -> float:
+        reads[0] += 1
+        return now[0]
+    deadline = Deadline(budget, reserve=0, clock=clock)
+    iterations = 0
+    while deadline.get_is_time_left():
+        now[0] += get_cost(iterations)
+        iterations += 1
+    return now[0], iterations, reads[0]
+
+
+def test_deadline_uses_the_budget_without_overruns():
+    for cost in (0.02, 0.005, 0.0005, 0.00001):
+        elapsed, iterations, reads = run_deadline(lambda iteration: cost)
+        assert 0.1 - 2 * cost <= elapsed <= 0.1 + 1e-9
+        if cost < 0.0005:
+            assert reads < iterations / 10
+
+
+def test_deadline_recovers_from_a_slow_iteration():
+    # a single slow iteration measured alone must not stop the loop for the rest of the budget
+    elapsed, _, _ = run_deadline(lambda iteration: 0.03 if iteration == 1 else 0.0005)
+    assert 0.09 <= elapsed <= 0.1 + 1e-9
+
+
+PARAMETER_NAMES = ('board_size', 'action_points_per_turn', 'pieces_per_player', 'explode_per_player',
+                   'block_per_player', 'win_condition_length', 'seed', 'use_bitboard')
+
+
+def test_serialization_round_trips_observations():
+    rng = random.Random(8)
+    forward_model = MacoForwardModel()
+    winners = set()
+    for use_bitboard in (False, True):
+        for seed in (None, 12):
+            parameters = MacoGameParameters(board_size=6, win_condition_length=4, seed=seed, use_bitboard=use_bitboard)
+            for _ in range(10):
+                game_state = MacoGameState(parameters)
+                while True:
+                    observation = game_state.get_observation()
+                    decoded = decode_observation(encode_observation(observation))
+                    assert [getattr(decoded.game_parameters, name) for name in PARAMETER_NAMES] == \
+                           [getattr(parameters, name) for name in PARAMETER_NAMES]
+                    assert get_state_snapshot(decoded) == get_state_snapshot(observation)
+                    assert decoded.get_key() == observation.get_key()
+                    if forward_model.is_terminal(game_state):
+                        winners.add(game_state.winner)
+                        break
+                    forward_model.step(game_state, get_random_test_action(game_state, rng))
+                    if game_state.get_action_points_left() == 0:
+                        forward_model.on_turn_ended(game_state)
+    assert {0, 1} <= winners
+
+
+def test_serialization_round_trips_actions():
+    parameters = MacoGameParameters()
+    observation = MacoGameState(parameters).get_observation()
+    actions = observation.get_actions() + [MacoAction(MacoPiece(piece_type), None) for piece_type in MacoPieceType]
+    decoded = decode_actions(encode_actions(actions))
+    assert [(action.get_piece().get_piece_type(), action.get_position()) for action in decoded] == \
+           [(action.get_piece().get_piece_type(), action.get_position()) for action in actions]
+    # with the parameters, the actions with a position are the interned ones
+    interned = decode_actions(encode_actions(observation.get_actions()), game_parameters=parameters)
+    assert all(action is original for action, original in zip(interned, observation.get_actions()))
+    assert decode_action(encode_action(None)).get_position() is None
+
+
+def has_line(board: dict, player: int, length: int) -> bool:
+    """Returns whether the player has `length` pieces in a row, scanning every cell of the board."""
+    for x, y in board:
+        for dx, dy in [(1, 0), (0, 1), (1, 1), (1, -1)]:
+            if all(board.get((x + i * dx, y + i * dy)) == player for i in range(length)):
+                return True
+    return False
+
+
+def test_bitboard_plays_like_the_dictionary_board():
+    rng = random.Random(9)
+    forward_model = MacoForwardModel()
+    for board_size, win_length in [(8, 6), (6, 4), (5, 5)]:
+        parameters = [MacoGameParameters(board_size=board_size, win_condition_length=win_length,
+                                         use_bitboard=use_bitboard) for use_bitboard in (False, True)]
+        for _ in range(10):
+            states = [MacoGameState(game_parameters) for game_parameters in parameters]
+            assert isinstance(states[1].board, MacoBitboard)
+            while not forward_model.is_terminal(states[0]):
+                action = get_random_test_action(states[0], rng)
+                for game_state in states:
+                    forward_model.step(game_state, action)
+                    if game_state.get_action_points_left() == 0:
+                        forward_model.on_turn_ended(game_state)
+                dict_state, bitboard_state = states
+                assert get_state_snapshot(bitboard_state) == get_state_snapshot(dict_state)
+                assert bitboard_state.board.is_full() == all(value is not None for value in dict_state.board.values())
+                for player in (0, 1):
+                    for length in (2, win_length):
+                        assert bitboard_state.board.has_line(player, length) == \
+                               has_line(dict_state.board, player, length)
+
+
+def test_zobrist_keys_follow_the_state():
+    rng = random.Random(10)
+    forward_model = MacoForwardModel()
+    for use_bitboard in (False, True):
+        parameters = MacoGameParameters(board_size=6, win_condition_length=4, use_bitboard=use_bitboard)
+        zobrist_table = parameters.get_zobrist_table()
+        for _ in range(10):
+            game_state = MacoGameState(parameters)
+            while not forward_model.is_terminal(game_state):
+                assert game_state.zobrist_key == zobrist_table.compute_key(game_state)
+                clone = game_state.get_observation().clone()
+                assert clone.get_key() == game_state.zobrist_key and clone == game_state.get_observation()
+
+                key = game_state.zobrist_key
+                undo = forward_model.step_with_undo(game_state, get_random_test_action(game_state, rng))
+                assert game_state.zobrist_key == zobrist_table.compute_key(game_state)
+                forward_model.unstep(game_state, undo)
+                assert game_state.zobrist_key == key
+
+                forward_model.step(game_state, get_random_test_action(game_state, rng))
+                if game_state.get_action_points_left() == 0:
+                    forward_model.on_turn_ended(game_state)
+
+
+def test_transposed_turns_reach_the_same_key():
+    forward_model = MacoForwardModel()
+    observation = MacoGameState(MacoGameParameters()).get_observation()
+    actions = [action for action in observation.get_actions()
+               if action.get_piece().get_piece_type() == MacoPieceType.REGULAR]
+    keys = set()
+    for order in ([0, 1, 2], [2, 0, 1], [1, 2, 0]):
+        state = observation.clone()
+        for index in order:
+            forward_model.step(state, actions[index])
+        keys.add(state.get_key())
+    assert len(keys) == 1
+    state = observation.clone()
+    for action in actions[3:6]:
+        forward_model.step(state, action)
+    assert state.get_key() not in keys
+
+
+def test_empty_cells_and_actions_follow_the_board():
+    rng = random.Random(11)
+    forward_model = MacoForwardModel()
+    for use_bitboard in (False, True):
+        parameters = MacoGameParameters(board_size=6, win_condition_length=4, use_bitboard=use_bitboard)
+        action_table = parameters.get_action_table()
+        assert action_table is MacoGameParameters(board_size=6).get_action_table()
+        for _ in range(10):
+            game_state = MacoGameState(parameters)
+            while not forward_model.is_terminal(game_state):
+                observation = game_state.get_observation()
+                empty_cells = [x * 6 + y for (x, y), value in sorted(game_state.board.items()) if value is None]
+                assert sorted(observation.empty_cells) == empty_cells
+                assert all(observation.empty_cells.cells[observation.empty_cells.places[cell]] == cell
+                           for cell in empty_cells)
+
+                pieces = observation.player_0_pieces if observation.current_turn == 0 else observation.player_1_pieces
+                piece_types = [index for index, piece_type in enumerate(MacoPieceType) if pieces.has_piece(piece_type)]
+                expected = [action_table[cell][index] for cell in empty_cells for index in piece_types]
+                actions = observation.get_actions()
+                assert len(actions) == len(expected)
+                assert all(action is expected_action for action, expected_action in zip(actions, expected))
+                random_action = observation.get_random_action(rng)
+                if random_action is not None:
+                    x, y = random_action.get_position()
+                    assert x * 6 + y in observation.empty_cells
+                    assert random_action is action_table[x * 6 + y][list(MacoPieceType).index(MacoPieceType.REGULAR)]
+
+                forward_model.step(game_state, get_random_test_action(game_state, rng))
+                if game_state.get_action_points_left() == 0:
+                    forward_model.on_turn_ended(game_state)
+
+
+def test_stored_terminal_status_matches_the_board():
+    rng = random.Random(12)
+    forward_model = MacoForwardModel()
+    outcomes = set()
+    for board_size, win_length in [(6, 4), (5, 5), (4, 5)]:
+        for use_bitboard in (False, True):
+            parameters = MacoGameParameters(board_size=board_size, win_condition_length=win_length,
+                                            use_bitboard=use_bitboard)
+            for _ in range(10):
+                game_state = MacoGameState(parameters)
+                while True:
+                    snapshot = get_state_snapshot(game_state)
+                    terminal = forward_model.is_terminal(game_state)
+                    assert get_state_snapshot(game_state) == snapshot
+                    observation = game_state.get_observation()
+                    assert (observation.terminal, observation.winner) == (game_state.terminal, game_state.winner)
+
+                    lines = [has_line(game_state.board, player, win_length) for player in (0, 1)]
+                    if any(lines):
+                        winner = game_state.current_turn if lines[game_state.current_turn] \
+                            else 1 - game_state.current_turn
+                        assert (terminal, game_state.winner) == (True, winner)
+                    elif all(value is not None for value in game_state.board.values()):
+                        assert (terminal, game_state.winner) == (True, -1)
+                        assert game_state.player_0_score == game_state.player_1_score == 0
+                    else:
+                        assert (terminal, game_state.winner) == (False, None)
+                    if terminal:
+                        outcomes.add(game_state.winner)
+                        break
+                    forward_model.step(game_state, get_random_test_action(game_state, rng))
+                    if game_state.get_action_points_left() == 0:
+                        forward_model.on_turn_ended(game_state)
+    assert outcomes == {-1, 0, 1}
+
+
+def get_child(tree: 'MontecarloTreeSearchTree', node: int, action: 'MacoAction') -> int:
+    """Returns the child of the node reached by the action."""
+    return next(child for child in tree.get_children(node) if tree.get_action(child) is action)
+
+
+def test_tree_merges_transposed_positions():
+    forward_model = MacoForwardModel()
+    observation = MacoGameState(MacoGameParameters()).get_observation()
+    first_action, second_action = [action for action in observation.get_actions()
+                                   if action.get_piece().get_piece_type() == MacoPieceType.REGULAR][:2]
+    for transpositions in (True, False):
+        tree = MontecarloTreeSearchTree(observation, SimpleHeuristic(), transpositions=transpositions)
+        leaves = []
+        for reward, actions in ((1.0, (first_action, second_action)), (0.5, (second_action, first_action))):
+            node = tree.ROOT
+            for action in actions:
+                tree.extend(forward_model, defaultdict(int))
+                node = get_child(tree, node, action)
+                tree.move_to_child(node, forward_model)
+            tree.backpropagate(node, reward)
+            tree.move_to_root(forward_model)
+            leaves.append(node)
+
+        assert leaves[0] != leaves[1]
+        if transpositions:
+            # both orders reach one position, which holds the statistics and children of both nodes
+            assert tree.get_average_reward(leaves[0]) == tree.get_average_reward(leaves[1]) == 0.75
+            assert tree.get_children(leaves[0]) == tree.get_children(leaves[1])
+            assert tree.get_amount_of_positions() < tree.get_size()
+        else:
+            assert (tree.get_average_reward(leaves[0]), tree.get_average_reward(leaves[1])) == (1.0, 0.5)
+            assert tree.get_amount_of_positions() == tree.get_size()
+        for child, reward in ((get_child(tree, tree.ROOT, first_action), 1.0),
+                              (get_child(tree, tree.ROOT, second_action), 0.5)):
+            assert tree.get_average_reward(child) == reward
+        assert tree.get_average_reward(tree.ROOT) == 0.75